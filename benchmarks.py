@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for diagram and documentation generation, saved as JSON so runs
+can be compared for regressions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+from reportlab import Version as REPORTLAB_VERSION
+
+import generate_documentation as documentation
+from generate_diagrams import (DEFAULT_WORKERS, FAILED, DiagramCache, HttpRenderer, RetryPolicy,
+                               StubRenderer, generate_all, plantuml_encode)
+from generate_fixtures import (DEFAULT_SIZES, RESULTS_PATH, UML_DIR, FixtureSizes, diagram_files,
+                               generate_fixture, synthetic_diagram, write_files)
+from plantuml_encoding import METHODS
+
+SUITES = ("encode", "diagrams", "documentation")
+DEFAULT_REPEAT = 3
+DEFAULT_OUTPUT = "benchmark-results.json"
+# Median slowdown (or speedup) reported by a comparison, as a fraction
+DEFAULT_THRESHOLD = 0.10
+# Round trip the stub server adds to every render, like a nearby PlantUML server
+DEFAULT_LATENCY_MS = 20
+
+# Input sizes: full runs model a large solution, --quick only checks the suite works
+SIZES = {
+    "full": {"diagram_classes": (10, 100, 1000), "fixture": DEFAULT_SIZES},
+    "quick": {"diagram_classes": (10, 100),
+              "fixture": FixtureSizes(models=30, view_models=5, services=5, test_classes=6,
+                                      tests_per_class=8, diagrams=8, diagram_size=10, commits=200,
+                                      authors=3)},
+}
+
+def measure(function, repeat, setup=None):
+    """Seconds taken by `repeat` calls of function; setup runs untimed before each"""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def summarize(runs, **params):
+    """Result entry for one benchmark"""
+    return {"median": statistics.median(runs), "min": min(runs), "mean": statistics.fmean(runs),
+            "runs": runs, "params": params}
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the progress output of the code being timed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+class StubServer:
+    """PlantUML server stand-in on localhost, answering with StubRenderer images
+    
+    `latency` seconds are added to every response so concurrency has
+    something to hide, as it does with a real server.
+    """
+    
+    def __init__(self, latency=DEFAULT_LATENCY_MS / 1000):
+        renderer = StubRenderer()
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes, don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+            
+            def _reply(self, fmt, encoded):
+                time.sleep(latency)
+                body = io.BytesIO()
+                renderer.render(None, encoded, fmt, body)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body.getvalue())))
+                self.end_headers()
+                self.wfile.write(body.getvalue())
+            
+            def do_GET(self):
+                _, fmt, encoded = self.path.split("/", 2)
+                self._reply(fmt, unquote(encoded))
+            
+            def do_POST(self):
+                text = self.rfile.read(int(self.headers["Content-Length"])).decode('utf-8')
+                self._reply(self.path.strip("/"), plantuml_encode(text))
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def bench_encode(sizes, repeat, seed):
+    """plantuml_encode() per encoding method and diagram size"""
+    results = {}
+    for classes in sizes["diagram_classes"]:
+        text = synthetic_diagram("class", classes, seed)
+        # Enough calls per run to be well above the timer resolution
+        calls = max(1, 2000 // classes)
+        for method in METHODS:
+            runs = measure(lambda: [plantuml_encode(text, method=method) for _ in range(calls)], repeat)
+            results[f"encode/{method}/{classes}-classes"] = summarize(
+                [seconds / calls for seconds in runs], classes=classes, bytes=len(text), calls=calls,
+                seed=seed)
+    return results
+
+def bench_diagrams(sizes, repeat, seed, work_dir, latency):
+    """generate_all() against the stub server: cold and warm cache, serial and concurrent"""
+    fixture = sizes["fixture"]
+    write_files(diagram_files(work_dir, random.Random(seed), fixture))
+    puml_files = sorted(Path(work_dir, UML_DIR).glob("*.puml"))
+    
+    results = {}
+    with StubServer(latency) as server:
+        for workers in (1, DEFAULT_WORKERS):
+            for warm in (False, True):
+                run_dir = Path(work_dir, f"diagrams-{workers}-{'warm' if warm else 'cold'}")
+                state = {"run": 0}
+                
+                def render(cache):
+                    output_dir = run_dir / f"out-{state['run']}"
+                    output_dir.mkdir(parents=True)
+                    renderer = HttpRenderer(server.url, pool_size=workers, retry=RetryPolicy(0))
+                    try:
+                        with quiet():
+                            outcomes, _ = generate_all(puml_files, output_dir, renderer,
+                                                       workers=workers, cache=cache)
+                    finally:
+                        renderer.close()
+                    if outcomes[FAILED]:
+                        raise RuntimeError(f"{outcomes[FAILED]} diagrams failed to render")
+                
+                def setup():
+                    state["run"] += 1
+                    # Cold runs start from an empty cache, warm ones from a filled one
+                    state["cache"] = DiagramCache(run_dir / f"cache-{state['run']}")
+                    if warm:
+                        render(state["cache"])
+                        state["run"] += 1
+                
+                runs = measure(lambda: render(state["cache"]), repeat, setup)
+                name = f"diagrams/{'warm' if warm else 'cold'}/{'serial' if workers == 1 else 'concurrent'}"
+                results[name] = summarize(runs, diagrams=len(puml_files),
+                                          diagram_size=fixture.diagram_size, seed=seed,
+                                          workers=workers, latency_ms=latency * 1000)
+    return results
+
+def bench_documentation(sizes, repeat, seed, work_dir, jobs):
+    """generate_documentation() end to end on a large synthetic project"""
+    fixture = sizes["fixture"]
+    root = os.path.join(work_dir, "project")
+    generate_fixture(root, seed, fixture)
+    # Every commit is listed, so the commit table is as long as the history
+    project = documentation.Project(root, history={"max_count": 0},
+                                    test_results=os.path.join(root, RESULTS_PATH))
+    project.output_path = os.path.join(work_dir, "documentation.pdf")
+    params = {**fixture._asdict(), "seed": seed}
+    
+    results = {}
+    with quiet():
+        results["documentation/serial"] = summarize(
+            measure(lambda: documentation.generate_documentation(project), repeat), **params)
+        results["documentation/parallel"] = summarize(
+            measure(lambda: documentation.generate_documentation_parallel(project, jobs=jobs), repeat),
+            jobs=jobs, **params)
+        cache_dir = str(Path(work_dir, "sections"))
+        documentation.generate_documentation_parallel(project, jobs=1, cache_dir=cache_dir)
+        results["documentation/incremental-warm"] = summarize(
+            measure(lambda: documentation.generate_documentation_parallel(project, jobs=1,
+                                                                          cache_dir=cache_dir),
+                    repeat), **params)
+    return results
+
+def environment():
+    """What the results depend on besides the code under test"""
+    try:
+        commit = subprocess.run(["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse",
+                                 "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"date": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "reportlab": REPORTLAB_VERSION}
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Print median changes between two result sets, return the number of regressions"""
+    old, new = baseline["benchmarks"], current["benchmarks"]
+    names = [name for name in new if name in old]
+    if not names:
+        print("No benchmarks in common with the baseline")
+        return 0
+    width = max(len("benchmark"), *(len(name) for name in names))
+    print(f"\n{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>7}")
+    regressions = 0
+    for name in names:
+        before, after = old[name]["median"], new[name]["median"]
+        change = after / before - 1 if before else 0.0
+        note = ""
+        if old[name]["params"] != new[name]["params"]:
+            # e.g. a --quick run against a full one, the times are not comparable
+            note = "inputs differ"
+        elif change > threshold:
+            note = "slower"
+            regressions += 1
+        elif change < -threshold:
+            note = "faster"
+        print(f"{name:<{width}}  {_format_seconds(before):>10}  {_format_seconds(after):>10}  "
+              f"{change:>+7.1%}  {note}")
+    for name in sorted(set(old) ^ set(new)):
+        print(f"{name:<{width}}  only in the {'baseline' if name in old else 'current run'}")
+    return regressions
+
+def _format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def parse_suites(value):
+    """argparse type for a comma separated list of suites"""
+    suites = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in suites if name not in SUITES]
+    if unknown or not suites:
+        raise argparse.ArgumentTypeError(
+            f"unknown suite(s) {', '.join(unknown) or value!r}, choose from {', '.join(SUITES)}")
+    return suites
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark diagram and documentation generation")
+    parser.add_argument("--suites", type=parse_suites, default=list(SUITES),
+                        help=f"comma separated suites to run (default: {','.join(SUITES)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"timed runs per benchmark, the median is compared (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--quick", action="store_true",
+                        help="small inputs, to check the suites run rather than to measure")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the generated inputs, see generate_fixtures.py (default: 0)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_MS, metavar="MS",
+                        help=f"delay the stub render server adds per request (default: {DEFAULT_LATENCY_MS})")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="processes for the parallel documentation build (default: CPU count)")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT,
+                        help=f"where to write the results (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--baseline", metavar="JSON",
+                        help="compare this run against earlier results, exit 1 on a regression")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="only compare two results files")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD * 100, metavar="PERCENT",
+                        help="median change reported as slower or faster "
+                             f"(default: {DEFAULT_THRESHOLD * 100:.0f})")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    args.threshold /= 100
+    return args
+
+def main(argv=None):
+    """Run the selected suites, save the results and optionally compare them"""
+    args = parse_args(argv)
+    if args.compare:
+        baseline, current = (load_results(path) for path in args.compare)
+        return 1 if compare(baseline, current, args.threshold) else 0
+    
+    sizes = SIZES["quick" if args.quick else "full"]
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as work_dir:
+        # Scanner, image and section caches go to a scratch directory, so a run
+        # neither reuses nor disturbs the user's
+        os.environ["XDG_CACHE_HOME"] = os.path.join(work_dir, "cache")
+        benchmarks = {}
+        for suite in args.suites:
+            print(f"Running {suite} benchmarks...")
+            suite_dir = os.path.join(work_dir, suite)
+            os.mkdir(suite_dir)
+            if suite == "encode":
+                results = bench_encode(sizes, args.repeat, args.seed)
+            elif suite == "diagrams":
+                results = bench_diagrams(sizes, args.repeat, args.seed, suite_dir, args.latency / 1000)
+            else:
+                results = bench_documentation(sizes, args.repeat, args.seed, suite_dir, args.jobs)
+            for name, result in results.items():
+                print(f"  {name:<40} {_format_seconds(result['median']):>10}")
+            benchmarks.update(results)
+    
+    current = {"environment": {**environment(), "quick": args.quick, "repeat": args.repeat},
+               "benchmarks": benchmarks}
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=1)
+    print(f"Results written to {args.output}")
+    if args.baseline:
+        return 1 if compare(load_results(args.baseline), current, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Timing and memory instrumentation for documentation builds: per-section
+producer cost and layout time per flowable type
+"""
+
+import cProfile
+import functools
+import json
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from reportlab.graphics.shapes import Drawing
+from reportlab.platypus import Flowable
+
+# Flowable methods the frame and container flowables call during layout
+LAYOUT_PHASES = {'wrap': 'wrap', 'split': 'split', 'drawOn': 'draw'}
+
+def _flowable_classes():
+    """Flowable and every subclass imported so far, diagrams (Drawing) included"""
+    classes, pending = [], [Flowable, Drawing]
+    while pending:
+        cls = pending.pop()
+        if cls not in classes:
+            classes.append(cls)
+            pending.extend(cls.__subclasses__())
+    return classes
+
+class BuildProfiler:
+    """Collects what each phase of a documentation build costs
+    
+    section() measures a section producer, layout() the doc.build call, with
+    wrap, split and draw time attributed to the flowable type doing the work.
+    Self time excludes nested flowables, e.g. the paragraphs in a table.
+    """
+    
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.sections = []
+        self.builds = []
+        # (flowable type, phase) -> [calls, total seconds, self seconds]
+        self.phases = defaultdict(lambda: [0, 0.0, 0.0])
+        self._stack = []
+    
+    @contextmanager
+    def _measure(self, record):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = time.process_time() - cpu
+            if self.trace_memory:
+                record['peak_bytes'] = tracemalloc.get_traced_memory()[1] - base
+    
+    def section(self, name):
+        """Context manager timing one section producer; count() its flowables"""
+        record = {'name': name, 'flowables': 0, 'types': Counter()}
+        self.sections.append(record)
+        return self._measure(record)
+    
+    def count(self, flowables):
+        """Count flowables against the section being measured"""
+        record = self.sections[-1]
+        for flowable in flowables:
+            record['flowables'] += 1
+            record['types'][type(flowable).__name__] += 1
+    
+    @contextmanager
+    def layout(self, name="document"):
+        """Time a doc.build call, with per-flowable timing while it runs"""
+        record = {'name': name}
+        self.builds.append(record)
+        with self._measure(record), self._instrumented():
+            yield record
+    
+    @contextmanager
+    def _instrumented(self):
+        """Wrap the layout methods of every Flowable class, restore them afterwards"""
+        patched = []
+        for cls in _flowable_classes():
+            for method, phase in LAYOUT_PHASES.items():
+                if method in cls.__dict__:
+                    original = cls.__dict__[method]
+                    setattr(cls, method, self._timed(original, phase))
+                    patched.append((cls, method, original))
+        try:
+            yield
+        finally:
+            for cls, method, original in reversed(patched):
+                setattr(cls, method, original)
+    
+    def _timed(self, function, phase):
+        stack, phases = self._stack, self.phases
+        
+        @functools.wraps(function)
+        def timed(flowable, *args, **kw):
+            # A subclass calling its base class method is one call, not two
+            if stack and stack[-1][0] is flowable and stack[-1][1] == phase:
+                return function(flowable, *args, **kw)
+            frame = [flowable, phase, 0.0]
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return function(flowable, *args, **kw)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1][2] += elapsed
+                stats = phases[(type(flowable).__name__, phase)]
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] += elapsed - frame[2]
+        return timed
+    
+    def as_dict(self):
+        """Everything measured, in a JSON friendly form"""
+        return {
+            'sections': [{**record, 'types': dict(record['types'])} for record in self.sections],
+            'layout': self.builds,
+            'flowables': [{'type': name, 'phase': phase, 'calls': calls, 'total': total, 'self': own}
+                          for (name, phase), (calls, total, own)
+                          in sorted(self.phases.items(), key=lambda item: -item[1][2])],
+        }
+    
+    def write_json(self, path):
+        """Dump as_dict() to a file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=1)
+    
+    def report(self, limit=15):
+        """Print the sections, the layout and the costliest flowable types"""
+        def memory(record):
+            return f"{record['peak_bytes'] / 1024:>9.0f}" if 'peak_bytes' in record else f"{'-':>9}"
+        
+        print(f"\n{'section':<16} {'wall':>8} {'cpu':>8} {'peak KB':>9} {'flowables':>9}")
+        for record in self.sections:
+            print(f"{record['name']:<16} {record['wall']:>7.3f}s {record['cpu']:>7.3f}s "
+                  f"{memory(record)} {record['flowables']:>9}")
+        for record in self.builds:
+            print(f"{'layout ' + record['name']:<16} {record['wall']:>7.3f}s {record['cpu']:>7.3f}s "
+                  f"{memory(record)}")
+        
+        rows = self.as_dict()['flowables'][:limit]
+        if rows:
+            width = max(len("flowable"), *(len(row['type']) for row in rows))
+            print(f"\n{'flowable':<{width}} {'phase':<5} {'calls':>7} {'total':>8} {'self':>8}")
+            for row in rows:
+                print(f"{row['type']:<{width}} {row['phase']:<5} {row['calls']:>7} "
+                      f"{row['total']:>7.3f}s {row['self']:>7.3f}s")
+
+def profile_call(path, function, *args, **kw):
+    """Run function under cProfile and write the stats to path for pstats or snakeviz"""
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(function, *args, **kw)
+    finally:
+        profile.dump_stats(path)
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Where the documentation tools keep their caches: a budget-planner-docs
+directory under the XDG cache directory
+"""
+
+import os
+
+CACHE_NAME = "budget-planner-docs"
+
+def cache_location(*parts):
+    """Path under the cache directory, from XDG_CACHE_HOME as it is when called"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, CACHE_NAME, *parts)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Lightweight scanner for the C# sources of the application, used to keep the
+documentation tables in step with the code
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from cache_dirs import cache_location
+
+DEFAULT_SOURCE_DIRS = ("Models", "ViewModels", "Services")
+DB_CONTEXT_PATH = os.path.join("Data", "BudgetDbContext.cs")
+# Parsed file cache, in the shared cache directory
+CACHE_FILE_NAME = "csharp-scan.json"
+# Bump when the parsed layout changes so stale cache entries are ignored
+CACHE_VERSION = 1
+
+TypeInfo = namedtuple("TypeInfo", "name kind modifiers bases properties db_sets summary")
+
+_TYPE_DECLARATION = re.compile(
+    r"^[ \t]*(?P<modifiers>(?:(?:public|internal|protected|private|abstract|sealed|static|partial)\s+)*)"
+    r"(?P<kind>class|interface|record|struct|enum)\s+(?P<name>\w+)(?:<[^>{]*>)?"
+    r"(?:\s*:\s*(?P<bases>[^{]+?))?\s*(?:where\s[^{]*)?\{",
+    re.MULTILINE)
+_PROPERTY = re.compile(
+    r"^[ \t]*public\s+(?P<modifiers>(?:(?:static|virtual|override|abstract|required|new)\s+)*)"
+    r"(?P<type>[\w.]+(?:<[^;{}()=]*?>)?[?\[\]]*)\s+(?P<name>\w+)\s*"
+    r"(?:\{\s*(?:get|set|init|private|protected|internal)\b|=>)",
+    re.MULTILINE)
+_DB_SET = re.compile(r"\bDbSet<\s*(?P<entity>\w+)\s*>\s+(?P<name>\w+)\s*\{")
+_SUMMARY = re.compile(r"<summary>(.*?)</summary>", re.DOTALL)
+
+def strip_comments(source):
+    """Blank out comments and string literals, keeping offsets and line breaks"""
+    def blank(match):
+        return re.sub(r"[^\n]", " ", match.group(0))
+    return re.sub(r'//[^\n]*|/\*.*?\*/|@"(?:[^"]|"")*"|"(?:[^"\\\n]|\\.)*"',
+                  blank, source, flags=re.DOTALL)
+
+def body_end(code, start):
+    """Offset just past the brace that closes the one at `start`"""
+    depth = 0
+    for index in range(start, len(code)):
+        if code[index] == "{":
+            depth += 1
+        elif code[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(code)
+
+def doc_summary(source, declaration_start):
+    """Text of the /// <summary> right above a declaration"""
+    comment = []
+    # Lines above the one the declaration (or its attributes) starts on
+    above = source[:source.rfind("\n", 0, declaration_start) + 1]
+    for line in reversed(above.splitlines()):
+        line = line.strip()
+        if line.startswith("///"):
+            comment.append(line[3:].strip())
+        elif not line.startswith("["):
+            # Attributes may sit between the comment and the declaration
+            break
+    text = "\n".join(reversed(comment))
+    match = _SUMMARY.search(text)
+    return " ".join((match.group(1) if match else text).split())
+
+def parse_source(source):
+    """Types declared in C# source text, nested types included"""
+    code = strip_comments(source)
+    types = []
+    for match in _TYPE_DECLARATION.finditer(code):
+        body_start = match.end() - 1
+        body = code[body_start:body_end(code, body_start)]
+        bases = [base.strip() for base in re.split(r",(?![^<]*>)", match.group("bases") or "")
+                 if base.strip()]
+        properties = [(prop.group("type"), prop.group("name"), "virtual" in prop.group("modifiers"))
+                      for prop in _PROPERTY.finditer(body)]
+        db_sets = [(db_set.group("entity"), db_set.group("name"))
+                   for db_set in _DB_SET.finditer(body)]
+        types.append(TypeInfo(match.group("name"), match.group("kind"),
+                              match.group("modifiers").split(), bases, properties, db_sets,
+                              doc_summary(source, match.start())))
+    return types
+
+class SourceScanner:
+    """Parses C# files, reusing earlier results for files that have not changed
+    
+    A file whose mtime and size match the cache entry is not read at all; one
+    that was only touched is read and hashed but not parsed again.
+    """
+    
+    def __init__(self, cache_path=None):
+        # None means the default location, False no cache at all
+        self.cache_path = cache_location(CACHE_FILE_NAME) if cache_path is None else cache_path
+        self.entries = self._load()
+        self.parsed = 0
+        self.reused = 0
+        self._dirty = False
+    
+    def _load(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if cache.get("version") != CACHE_VERSION:
+            return {}
+        return cache.get("files", {})
+    
+    def save(self):
+        """Write the cache back if anything was parsed or re-validated"""
+        if not self.cache_path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "files": self.entries}, f, ensure_ascii=False)
+        os.replace(temp_path, self.cache_path)
+        self._dirty = False
+    
+    def scan_file(self, path):
+        """Types declared in one file"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self.reused += 1
+            return [TypeInfo(*fields) for fields in entry["types"]]
+        
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if entry and entry["sha1"] == digest:
+            self.reused += 1
+            types = [TypeInfo(*fields) for fields in entry["types"]]
+        else:
+            self.parsed += 1
+            types = parse_source(data.decode('utf-8-sig', errors='replace'))
+        self.entries[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                              "sha1": digest, "types": [list(info) for info in types]}
+        self._dirty = True
+        return types
+    
+    def scan_directory(self, directory):
+        """Types declared in the .cs files of a directory tree, in path order"""
+        types = []
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = sorted(name for name in dirnames if name not in ("bin", "obj"))
+            for filename in sorted(filenames):
+                if filename.endswith(".cs"):
+                    types.extend(self.scan_file(os.path.join(dirpath, filename)))
+        return types
+    
+    def scan(self, source_dir, directories=DEFAULT_SOURCE_DIRS):
+        """Map each of `directories` under source_dir to the types declared in it"""
+        return {name: self.scan_directory(os.path.join(source_dir, name)) for name in directories}
+    
+    def db_sets(self, source_dir):
+        """(entity, property) pairs of the DbSets declared by the DbContext"""
+        path = os.path.join(source_dir, DB_CONTEXT_PATH)
+        if not os.path.exists(path):
+            return []
+        return [db_set for info in self.scan_file(path) for db_set in info.db_sets]
+
+def main(argv=None):
+    """Print what the scanner finds, mainly to check it against the sources"""
+    parser = argparse.ArgumentParser(description="List the types found in the C# sources")
+    parser.add_argument("source_dir", help="application project directory, e.g. BudgetPlanner.App")
+    default_cache = cache_location(CACHE_FILE_NAME)
+    parser.add_argument("--cache", default=default_cache,
+                        help=f"parsed file cache (default: {default_cache})")
+    parser.add_argument("--no-cache", action="store_const", const=False, dest="cache",
+                        help="parse every file")
+    args = parser.parse_args(argv)
+    
+    scanner = SourceScanner(args.cache)
+    for directory, types in scanner.scan(args.source_dir).items():
+        print(f"{directory}/")
+        for info in types:
+            bases = f" : {', '.join(info.bases)}" if info.bases else ""
+            print(f"  {' '.join(info.modifiers + [info.kind])} {info.name}{bases}"
+                  f" ({len(info.properties)} properties)")
+    for entity, name in scanner.db_sets(args.source_dir):
+        print(f"DbSet<{entity}> {name}")
+    scanner.save()
+    print(f"Parsed {scanner.parsed} file(s), reused {scanner.reused} from cache")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Diagram images for the documentation, resampled to the size they are printed
+at and cached on disk
+"""
+
+import hashlib
+import os
+import pickle
+
+from PIL import Image as PILImage
+from reportlab import Version as REPORTLAB_VERSION
+from reportlab.graphics.shapes import Drawing, Group
+from reportlab.lib.attrmap import AttrMap, AttrMapValue
+from reportlab.lib.validators import isString
+
+from cache_dirs import cache_location
+
+try:
+    import svglib
+    from svglib.svglib import svg2rlg
+except ImportError:
+    svg2rlg = None
+
+DEFAULT_DPI = 150
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+SVG_EXTENSIONS = (".svg",)
+# Vector diagrams need the optional svglib; without it SVGs are ignored
+SVG_SUPPORT = svg2rlg is not None
+
+# (path, mtime_ns, size) -> content digest, saves rehashing within a batch
+_digests = {}
+
+def content_digest(path):
+    """SHA-256 of a file, remembered until the file changes"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        with open(path, 'rb') as f:
+            _digests[key] = hashlib.sha256(f.read()).hexdigest()
+    return _digests[key]
+
+def find_image(directories, name, extensions=IMAGE_EXTENSIONS):
+    """First image called `name` (any case, any of `extensions`) in the directories"""
+    wanted = name.lower()
+    for directory in directories:
+        try:
+            filenames = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for filename in filenames:
+            stem, extension = os.path.splitext(filename)
+            if stem.lower() == wanted and extension.lower() in extensions:
+                return os.path.join(directory, filename)
+    return None
+
+def fit(size, max_width, max_height):
+    """Largest (width, height) in points with the aspect ratio of `size` inside the box"""
+    width, height = size
+    scale = min(max_width / width, max_height / height)
+    return width * scale, height * scale
+
+class ImageCache:
+    """Resampled copies of images, keyed by source content and pixel size
+    
+    A diagram is decoded and resampled once per size; later builds only hash
+    the source file to find the cached copy.
+    """
+    
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or cache_location("images")
+    
+    def scaled(self, path, max_width, max_height, dpi=DEFAULT_DPI):
+        """(image path, width, height) for printing `path` inside a box given in points
+        
+        Images with more pixels than `dpi` needs are replaced by a resampled copy;
+        smaller ones are used as they are.
+        """
+        with PILImage.open(path) as image:
+            source_size = image.size
+        width, height = fit(source_size, max_width, max_height)
+        pixels = (round(width / 72 * dpi), round(height / 72 * dpi))
+        if pixels[0] >= source_size[0]:
+            return path, width, height
+        
+        cached = os.path.join(self.cache_dir, f"{content_digest(path)}-{pixels[0]}x{pixels[1]}.png")
+        if not os.path.exists(cached):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with PILImage.open(path) as image:
+                has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+                resized = image.convert("RGBA" if has_alpha else "RGB").resize(pixels, PILImage.LANCZOS)
+            if not has_alpha:
+                # Diagrams have few colours, a palette keeps the PNG small
+                resized = resized.quantize(256)
+            temp_path = f"{cached}.{os.getpid()}.tmp"
+            resized.save(temp_path, format="PNG", optimize=True)
+            os.replace(temp_path, cached)
+        return cached, width, height
+
+class SourceDrawing(Drawing):
+    """Drawing that remembers the digest of the SVG file it was parsed from
+    
+    Lets layout caches identify a diagram without walking its shapes.
+    """
+    
+    _attrMap = AttrMap(BASE=Drawing, source_digest=AttrMapValue(isString, desc="SHA-256 of the SVG"))
+
+class DrawingCache:
+    """Vector drawings parsed from SVG files, kept in memory and pickled on disk
+    
+    Parsing an SVG is much slower than unpickling the drawing it produces, so
+    an unchanged SVG is parsed once, not on every build.
+    """
+    
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or cache_location("images", "drawings")
+        self._drawings = {}
+    
+    def load(self, path):
+        """Drawing parsed from an SVG file, at the SVG's own size"""
+        # Pickles are only valid for the library versions that wrote them
+        key = f"{content_digest(path)}-svglib{svglib.__version__}-rl{REPORTLAB_VERSION}"
+        if key in self._drawings:
+            return self._drawings[key]
+        
+        cached = os.path.join(self.cache_dir, f"{key}.pickle")
+        try:
+            with open(cached, 'rb') as f:
+                drawing = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            drawing = svg2rlg(path)
+            if drawing is None:
+                raise ValueError(f"{path} is not a usable SVG file")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cached}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(drawing, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cached)
+        self._drawings[key] = drawing
+        return drawing
+    
+    def scaled(self, path, max_width, max_height):
+        """Drawing of an SVG file scaled to fit a box given in points"""
+        drawing = self.load(path)
+        width, height = fit((drawing.width, drawing.height), max_width, max_height)
+        scale = width / drawing.width
+        # Wrap rather than rescale, the memoized drawing is shared between builds
+        group = Group(*drawing.contents, transform=(scale, 0, 0, scale, 0, 0))
+        scaled = SourceDrawing(width, height, group)
+        scaled.source_digest = content_digest(path)
+        return scaled
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Long tables laid out a page at a time from a row iterator, with the header
+repeated at the top of every page
+"""
+
+from reportlab.platypus import Flowable, Table
+
+# Rows pulled for the first page before anything is known about row heights
+INITIAL_PAGE_ROWS = 50
+
+class _RowSource:
+    """Rows pulled from an iterator but not yet placed on a page"""
+    
+    def __init__(self, rows):
+        self.iterator = iter(rows() if callable(rows) else rows)
+        self.pending = []
+        self.exhausted = False
+        self.page_rows = INITIAL_PAGE_ROWS
+        self.split = False
+    
+    def peek(self, count):
+        """Up to `count` rows, pulling more from the iterator when needed"""
+        while len(self.pending) < count and not self.exhausted:
+            try:
+                self.pending.append(next(self.iterator))
+            except StopIteration:
+                self.exhausted = True
+        return self.pending[:count]
+    
+    def is_last(self, count):
+        """Whether the first `count` rows are all that is left"""
+        return self.exhausted and len(self.pending) <= count
+    
+    def consume(self, count):
+        del self.pending[:count]
+    
+    def close(self):
+        # Stops a generator early, e.g. the git log feeding the commit table
+        close = getattr(self.iterator, 'close', None)
+        if close:
+            close()
+
+class StreamingTable(Flowable):
+    """Table that pulls its rows only as pages are filled
+    
+    Each page gets its own Table of just the rows that fit, so layout time is
+    linear in the number of rows and only one page of rows is held at a time.
+    `rows` is a sequence, or a function returning a fresh iterator of rows;
+    a document laid out in several passes (for the table of contents) reads
+    the rows once per pass.
+    """
+    
+    def __init__(self, header, rows, col_widths, style, hAlign='CENTER'):
+        super().__init__()
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.style = style
+        self.hAlign = hAlign
+        self._source = None
+        self._table = None
+        self._rows = []
+    
+    def iter_rows(self):
+        """Every body row, read from the start"""
+        return iter(self.rows() if callable(self.rows) else self.rows)
+    
+    def _make_table(self, rows):
+        header = [self.header] if self.header else []
+        table = Table(header + rows, colWidths=self.col_widths, repeatRows=len(header),
+                      hAlign=self.hAlign)
+        table.setStyle(self.style)
+        return table
+    
+    def wrap(self, availWidth, availHeight):
+        # A table already split in this layout pass is being laid out again in the
+        # next one: start over from the first row
+        if self._source is None or self._source.split:
+            if self._source is not None:
+                self._source.close()
+            self._source = _RowSource(self.rows)
+        return self._fill(availWidth, availHeight)
+    
+    def _fill(self, availWidth, availHeight):
+        """Build the table for this page: all remaining rows, or more than fit"""
+        source = self._source
+        count = source.page_rows
+        while True:
+            self._rows = source.peek(count)
+            if not self._rows and source.is_last(0):
+                self._table = None
+                return 0, 0
+            self._table = self._make_table(self._rows)
+            width, height = self._table.wrap(availWidth, availHeight)
+            if height > availHeight or source.is_last(count):
+                return width, height
+            count *= 2
+    
+    def split(self, availWidth, availHeight):
+        if self._table is None:
+            return []
+        self._table.wrap(availWidth, availHeight)
+        parts = self._table.split(availWidth, availHeight)
+        if not parts:
+            return []
+        first = parts[0]
+        placed = first._nrows - (1 if self.header else 0)
+        if placed <= 0:
+            return []
+        source = self._source
+        source.consume(placed)
+        source.split = True
+        # The next page is usually full height, so start from one row more than fitted
+        source.page_rows = max(placed + 1, source.page_rows)
+        return [first, _Continuation(self, source)]
+    
+    def draw(self):
+        if self._table is not None:
+            self._table.drawOn(self.canv, 0, 0)
+
+class _Continuation(StreamingTable):
+    """Rest of a StreamingTable after a page break, reading from the same rows"""
+    
+    def __init__(self, table, source):
+        super().__init__(table.header, table.rows, table.col_widths, table.style, table.hAlign)
+        self._source = source
+    
+    def wrap(self, availWidth, availHeight):
+        return self._fill(availWidth, availHeight)
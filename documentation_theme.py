@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Shared paragraph and table styles for the generated project documentation
+"""
+
+from functools import lru_cache
+import json
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.platypus import TableStyle
+
+DEFAULT_PALETTE = {
+    'primary': '#1a5490',
+    'secondary': '#2c5aa0',
+    'header_text': '#f5f5f5',
+    'grid': '#808080',
+    'row_alternate': '#f0f0f0',
+    'code_background': '#f5f5f5',
+    'layer_label': '#e8f4f8',
+    'layer_row': '#f8f8f8',
+}
+
+DEFAULT_FONTS = {
+    'regular': 'Helvetica',
+    'bold': 'Helvetica-Bold',
+    'italic': 'Helvetica-Oblique',
+    'code': 'Courier',
+}
+
+class Theme(StyleSheet1):
+    """Sample stylesheet extended with the documentation's paragraph and table styles"""
+
+    def __init__(self, palette=None, fonts=None):
+        super().__init__()
+        self.palette = {**DEFAULT_PALETTE, **(palette or {})}
+        self.fonts = {**DEFAULT_FONTS, **(fonts or {})}
+        self.tables = {}
+        
+        sample = getSampleStyleSheet()
+        for name, style in sample.byName.items():
+            alias = next((a for a, s in sample.byAlias.items() if s is style), None)
+            self.add(style, alias)
+        self._add_paragraph_styles()
+        self._add_table_styles()
+
+    def color(self, name):
+        """Palette entry as a reportlab color"""
+        return colors.HexColor(self.palette[name])
+
+    def _add_paragraph_styles(self):
+        self.add(ParagraphStyle(
+            'CustomTitle',
+            parent=self['Heading1'],
+            fontSize=28,
+            textColor=self.color('primary'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName=self.fonts['bold']
+        ))
+        self.add(ParagraphStyle(
+            'Subtitle',
+            parent=self['Normal'],
+            fontSize=16,
+            textColor=self.color('secondary'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName=self.fonts['regular']
+        ))
+        self.add(ParagraphStyle(
+            'Info',
+            parent=self['Normal'],
+            fontSize=12,
+            alignment=TA_CENTER
+        ))
+        # The sample sheet already owns 'Code', this is the boxed listing style
+        self.add(ParagraphStyle(
+            'CodeBlock',
+            parent=self['Normal'],
+            fontName=self.fonts['code'],
+            fontSize=8,
+            leftIndent=20,
+            textColor=self.color('secondary'),
+            backColor=self.color('code_background')
+        ))
+        self.add(ParagraphStyle(
+            'Caption',
+            parent=self['Normal'],
+            fontSize=9,
+            alignment=TA_CENTER,
+            textColor=self.color('secondary'),
+            fontName=self.fonts['italic']
+        ))
+        # Wrapping text inside 'data' and 'attributes' tables
+        self.add(ParagraphStyle('TableCell', parent=self['Normal'], fontSize=10, leading=12))
+        # Own style name so the TOC heading is not listed in itself
+        self.add(ParagraphStyle('TOCHeading', parent=self['Heading1']))
+        self.add(ParagraphStyle('TOC1', parent=self['Normal'], fontSize=11, leading=14,
+                                leftIndent=0, firstLineIndent=0, spaceAfter=6))
+        self.add(ParagraphStyle('TOC2', parent=self['Normal'], fontSize=11, leading=14,
+                                leftIndent=20, firstLineIndent=0, spaceAfter=6))
+
+    def _add_table_styles(self):
+        header = [
+            ('BACKGROUND', (0, 0), (-1, 0), self.color('primary')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), self.color('header_text')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), self.fonts['bold']),
+        ]
+        body = [
+            ('GRID', (0, 0), (-1, -1), 1, self.color('grid')),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, self.color('row_alternate')]),
+        ]
+        
+        # Key/value overview with a larger header row
+        self.tables['overview'] = TableStyle(header + [
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ] + body)
+        # Header plus rows of columnar data
+        self.tables['data'] = TableStyle(header + [
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ] + body)
+        # Like 'data', for cells holding multi-line text
+        self.tables['attributes'] = TableStyle(header + [
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ] + body)
+        # Label column on the left instead of a header row
+        self.tables['layers'] = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), self.color('layer_label')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTNAME', (0, 0), (0, -1), self.fonts['bold']),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, self.color('grid')),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1),
+             [self.color('layer_row'), colors.white, self.color('layer_row')]),
+        ])
+
+@lru_cache(maxsize=None)
+def load_theme(path=None):
+    """Build the theme once per process, optionally from a JSON config file
+    
+    The file may override any of DEFAULT_PALETTE under "palette" and
+    DEFAULT_FONTS under "fonts", e.g. {"palette": {"primary": "#7a003c"}}.
+    """
+    config = {}
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    return Theme(config.get('palette'), config.get('fonts'))
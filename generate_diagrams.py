@@ -1,71 +1,892 @@
 #!/usr/bin/env python3
 """
-Script to generate PNG diagrams from PlantUML files using PlantUML server
+Script to generate PNG, SVG, PDF or EPS diagrams from PlantUML files using a
+PlantUML server, a local plantuml.jar or a stub renderer for tests
 """
 
+import argparse
+import hashlib
+import json
 import os
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
 import requests
 import zlib
-import base64
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from functools import cached_property
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
-def plantuml_encode(plantuml_text):
+import plantuml_encoding
+from plantuml_encoding import DEFAULT_LEVEL, DEFAULT_MAX_URL_LENGTH, DEFLATE
+
+DEFAULT_UML_DIR = Path("/home/claude/BudgetPlanner/Documentation/UML")
+DEFAULT_OUTPUT_DIR = Path("/home/claude/BudgetPlanner/Documentation/Images")
+DEFAULT_WORKERS = 4
+SUPPORTED_FORMATS = ("png", "svg", "pdf", "eps")
+DEFAULT_FORMATS = ("png",)
+DEFAULT_RENDERER = "http"
+DEFAULT_SERVER_URL = "http://www.plantuml.com/plantuml"
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "plantuml-diagrams"
+DEFAULT_CACHE_SIZE_MB = 256
+DEFAULT_RETRIES = 3
+# Longest Retry-After honoured; a server asking for more fails the render instead
+DEFAULT_MAX_RETRY_AFTER = 300.0
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes every valid output of a format starts with
+FORMAT_SIGNATURES = {
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "svg": (b"<?xml", b"<svg"),
+    "pdf": (b"%PDF-",),
+    "eps": (b"%!PS",),
+}
+MANIFEST_NAME = ".diagram-manifest.json"
+
+# Per-diagram outcomes reported by generate_diagram()
+RENDERED = "rendered"
+CACHED = "cached"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+_print_lock = threading.Lock()
+_request_local = threading.local()
+
+# Seconds spent opening connections, waiting for the server and reading the body
+RequestTiming = namedtuple("RequestTiming", "connect server download total size")
+
+def log(*lines):
+    """Print lines as one block so concurrent workers don't interleave"""
+    with _print_lock:
+        print("\n".join(lines))
+
+def plantuml_encode(plantuml_text, level=DEFAULT_LEVEL, method=DEFLATE):
     """Encode PlantUML text for URL"""
-    zlibbed_str = zlib.compress(plantuml_text.encode('utf-8'))
-    compressed_string = zlibbed_str[2:-4]
-    return base64.urlsafe_b64encode(compressed_string).decode('utf-8')
+    return plantuml_encoding.encode(plantuml_text, level, method)
+
+def validate_image(path, fmt):
+    """Raise ValueError unless path starts with the signature of `fmt`"""
+    with open(path, 'rb') as f:
+        head = f.read(512)
+    if not head:
+        raise ValueError(f"empty {fmt} output")
+    if fmt == "svg":
+        head = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if not head.startswith(FORMAT_SIGNATURES[fmt]):
+        raise ValueError(f"output is not a valid {fmt.upper()} file")
+
+def _umask():
+    """The process umask; reading it means setting it, so this is done once at import"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Mode of files written through a temp file, as open() would have created them
+FILE_MODE = 0o666 & ~_umask()
+
+def make_temp(directory, prefix=None, suffix=".tmp"):
+    """mkstemp() with FILE_MODE rather than 0600, so renamed outputs stay readable by others"""
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=suffix)
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, FILE_MODE)
+    return fd, tmp_name
+
+def write_atomic(output_file, write, fmt):
+    """Stream write(f) into a temp file, validate it and rename it over output_file"""
+    fd, tmp_name = make_temp(output_file.parent, prefix=f".{output_file.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        validate_image(tmp_name, fmt)
+        os.replace(tmp_name, output_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+def copy_file(source):
+    """write() callback for write_atomic copying `source` in chunks"""
+    def write(f):
+        with open(source, 'rb') as src:
+            shutil.copyfileobj(src, f, CHUNK_SIZE)
+    return write
+
+class DiagramCache:
+    """Content-addressed store of rendered diagrams with size-based LRU eviction"""
+    
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(encoded, fmt, renderer):
+        """Cache key for an encoded diagram rendered to `fmt` by `renderer`"""
+        digest = hashlib.sha256()
+        for part in (renderer, fmt, encoded):
+            digest.update(part.encode('utf-8'))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _path(self, key, fmt):
+        return self.cache_dir / key[:2] / f"{key}.{fmt}"
+    
+    def fetch(self, key, fmt, output_file):
+        """Copy a cached diagram to output_file, return False on a miss"""
+        path = self._path(key, fmt)
+        try:
+            write_atomic(output_file, copy_file(path), fmt)
+        except FileNotFoundError:
+            return False
+        except ValueError:
+            # Corrupt entry, drop it and render again
+            path.unlink(missing_ok=True)
+            return False
+        # Bump the mtime so eviction sees this entry as recently used. Another
+        # build may have pruned it since the copy, which is fine: we have the file.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return True
+    
+    def store(self, key, fmt, output_file):
+        """Add a rendered diagram file to the cache"""
+        path = self._path(key, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, copy_file(output_file), fmt)
+    
+    def entries(self):
+        """Return (mtime, size, path) for every cached diagram"""
+        entries = []
+        for path in self.cache_dir.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def prune(self, max_size=None):
+        """Evict least recently used diagrams until the cache fits, return (removed, freed bytes)"""
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock:
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            removed = freed = 0
+            for _, size, path in entries:
+                if total <= max_size:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                freed += size
+                removed += 1
+            return removed, freed
+
+class Renderer:
+    """Base class for diagram rendering backends"""
+    
+    name = None
+    
+    @property
+    def identity(self):
+        """String identifying the renderer configuration, part of the cache key"""
+        return self.name
+    
+    def render(self, plantuml_text, encoded, fmt, out):
+        """Render one diagram, writing the image to the binary file `out`"""
+        raise NotImplementedError
+    
+    def last_timing(self):
+        """RequestTiming of the calling thread's latest render, if the backend measures it"""
+        return None
+    
+    def timing_summary(self):
+        """Lines describing aggregate request timings"""
+        return []
+    
+    def close(self):
+        """Release any resources held by the renderer"""
 
-def generate_diagram(puml_file, output_dir):
-    """Generate PNG diagram from PlantUML file"""
-    print(f"Processing {puml_file.name}...")
+class TokenBucket:
+    """Thread-safe token bucket limiting how many requests start per second"""
+    
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
     
-    with open(puml_file, 'r', encoding='utf-8') as f:
-        plantuml_text = f.read()
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = max(self.blocked_until - now, (1.0 - self.tokens) / self.rate)
+            time.sleep(wait)
     
-    # Encode the PlantUML text
-    encoded = plantuml_encode(plantuml_text)
+    def pause(self, seconds):
+        """Hold back every caller for `seconds`, e.g. when the server sends Retry-After"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient server errors
     
-    # Generate PNG using PlantUML server
-    url = f"http://www.plantuml.com/plantuml/png/{encoded}"
+    A Retry-After from the server is waited out in full, as long as it is no
+    more than max_retry_after; retrying earlier would only use up the retries.
+    """
     
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    
+    def __init__(self, retries=DEFAULT_RETRIES, base_delay=0.5, max_delay=30.0,
+                 max_retry_after=DEFAULT_MAX_RETRY_AFTER):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+    
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0 based)"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header given as a delay or an HTTP date"""
+    if not value:
+        return None
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class _ConnectTimer:
+    """Connection mixin adding setup time (TCP and TLS) to the current request"""
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _request_local.connect_time = (getattr(_request_local, "connect_time", 0.0)
+                                           + time.perf_counter() - start)
+
+class _TimedHTTPConnection(_ConnectTimer, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_ConnectTimer, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """Keep-alive connection pool whose connections record their setup time"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+class HttpRenderer(Renderer):
+    """Render through a PlantUML server, public or self-hosted"""
+    
+    name = "http"
+    
+    def __init__(self, server_url=DEFAULT_SERVER_URL, timeout=30, pool_size=DEFAULT_WORKERS,
+                 retry=None, rate_limiter=None, post_threshold=DEFAULT_MAX_URL_LENGTH):
+        self.server_url = server_url.rstrip("/")
+        self.timeout = timeout
+        self.post_threshold = post_threshold
+        self.retry = retry or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.timings = []
+        self.retries = 0
+        self.posts = 0
+        self._timings_lock = threading.Lock()
         
-        # Save PNG file
-        output_file = output_dir / f"{puml_file.stem}.png"
-        with open(output_file, 'wb') as f:
-            f.write(response.content)
+        # One keep-alive session shared by all workers, sized so none waits for a socket
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    @property
+    def identity(self):
+        return f"{self.name}:{self.server_url}"
+    
+    def render(self, plantuml_text, encoded, fmt, out):
+        if len(encoded) > self.post_threshold:
+            # Oversized diagrams go in the request body instead of a very long URL
+            url = f"{self.server_url}/{fmt}"
+            body = plantuml_text.encode('utf-8')
+            with self._timings_lock:
+                self.posts += 1
+        else:
+            url = f"{self.server_url}/{fmt}/{encoded}"
+            body = None
+        for attempt in range(self.retry.retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            retry_after = None
+            # Discard whatever a failed attempt managed to write
+            out.seek(0)
+            out.truncate()
+            try:
+                return self._fetch(url, out, body)
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                error = e
+            except requests.HTTPError as e:
+                if e.response.status_code not in self.retry.RETRY_STATUSES:
+                    raise
+                error = e
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.retry.max_retry_after:
+                    raise RuntimeError(f"server asked to retry after {retry_after:.0f}s, more than "
+                                       f"--max-retry-after {self.retry.max_retry_after:.0f}s") from e
+                if retry_after is not None and self.rate_limiter:
+                    self.rate_limiter.pause(retry_after)
+            if attempt == self.retry.retries:
+                break
+            with self._timings_lock:
+                self.retries += 1
+            time.sleep(self.retry.delay(attempt, retry_after))
+        raise error
+    
+    def _fetch(self, url, out, body=None):
+        _request_local.connect_time = 0.0
+        start = time.perf_counter()
+        if body is None:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+        else:
+            response = self.session.post(url, data=body, timeout=self.timeout, stream=True,
+                                         headers={"Content-Type": "text/plain; charset=utf-8"})
+        with response:
+            response.raise_for_status()
+            size = 0
+            for chunk in response.iter_content(CHUNK_SIZE):
+                out.write(chunk)
+                size += len(chunk)
+            total = time.perf_counter() - start
+            
+            # Content-Length counts encoded bytes, compare against what came off the wire
+            expected = response.headers.get("Content-Length")
+            received = response.raw.tell() if response.headers.get("Content-Encoding") else size
+            if expected is not None and expected.isdigit() and int(expected) != received:
+                raise requests.ConnectionError(
+                    f"incomplete download, expected {expected} bytes but got {received}")
         
-        print(f"  ✓ Generated {output_file.name}")
-        return True
-    except Exception as e:
-        print(f"  ✗ Error: {e}")
-        return False
+        # response.elapsed stops once headers are parsed, the rest is body transfer
+        headers = response.elapsed.total_seconds()
+        connect = _request_local.connect_time
+        timing = RequestTiming(connect, max(headers - connect, 0.0), max(total - headers, 0.0),
+                               total, size)
+        _request_local.last_timing = timing
+        with self._timings_lock:
+            self.timings.append(timing)
+    
+    def last_timing(self):
+        return getattr(_request_local, "last_timing", None)
+    
+    def timing_summary(self):
+        with self._timings_lock:
+            timings = list(self.timings)
+        if not timings:
+            return []
+        count = len(timings)
+        new_connections = sum(1 for t in timings if t.connect > 0)
+        return [
+            f"HTTP requests: {count} ({self.posts} POST), retries: {self.retries}, "
+            f"new connections: {new_connections}, "
+            f"received {sum(t.size for t in timings) / 1024:.1f} KiB",
+            f"  avg connect {_ms(sum(t.connect for t in timings) / count)}, "
+            f"server {_ms(sum(t.server for t in timings) / count)}, "
+            f"download {_ms(sum(t.download for t in timings) / count)}, "
+            f"total {_ms(sum(t.total for t in timings) / count)}",
+        ]
+    
+    def close(self):
+        self.session.close()
 
-def main():
+def _ms(seconds):
+    return f"{seconds * 1000:.1f} ms"
+
+class JarRenderer(Renderer):
+    """Render with long-lived `plantuml.jar -pipe` processes, one JVM per output format"""
+    
+    name = "jar"
+    
+    def __init__(self, jar_path, java="java"):
+        self.jar_path = Path(jar_path)
+        self.java = java
+        self.delimiter = f"__PLANTUML_DIAGRAM_END_{uuid.uuid4().hex}__".encode('ascii')
+        self._processes = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def identity(self):
+        return f"{self.name}:{self.jar_path.resolve()}"
+    
+    def _process(self, fmt):
+        with self._lock:
+            entry = self._processes.get(fmt)
+            if entry is None or entry[0].poll() is not None:
+                process = subprocess.Popen(
+                    [self.java, "-Djava.awt.headless=true", "-jar", str(self.jar_path),
+                     "-pipe", f"-t{fmt}", "-charset", "UTF-8",
+                     "-pipedelimitor", self.delimiter.decode('ascii')],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                entry = (process, threading.Lock(), bytearray())
+                self._processes[fmt] = entry
+            return entry
+    
+    def render(self, plantuml_text, encoded, fmt, out):
+        process, lock, buffer = self._process(fmt)
+        # A JVM renders one diagram at a time, concurrent callers queue on its lock
+        with lock:
+            text = plantuml_text if plantuml_text.endswith("\n") else plantuml_text + "\n"
+            process.stdin.write(text.encode('utf-8'))
+            process.stdin.flush()
+            while True:
+                end = buffer.find(self.delimiter)
+                if end >= 0:
+                    out.write(buffer[:end])
+                    newline = buffer.find(b"\n", end)
+                    del buffer[:newline + 1 if newline >= 0 else end + len(self.delimiter)]
+                    return
+                # Flush all but a possible partial delimiter to keep memory flat
+                keep = len(self.delimiter) - 1
+                if len(buffer) > keep:
+                    out.write(buffer[:-keep])
+                    del buffer[:-keep]
+                chunk = process.stdout.read1(CHUNK_SIZE)
+                if not chunk:
+                    raise RuntimeError(f"plantuml.jar exited with code {process.wait()}")
+                buffer.extend(chunk)
+    
+    def close(self):
+        with self._lock:
+            for process, _, _ in self._processes.values():
+                process.stdin.close()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            self._processes.clear()
+
+class StubRenderer(Renderer):
+    """Offline renderer producing tiny placeholder images, for tests"""
+    
+    name = "stub"
+    
+    def render(self, plantuml_text, encoded, fmt, out):
+        out.write(self._image(hashlib.sha256(encoded.encode('ascii')).hexdigest(), fmt))
+    
+    @staticmethod
+    def _image(digest, fmt):
+        if fmt == "png":
+            return _stub_png(digest)
+        if fmt == "svg":
+            return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                    f'<svg xmlns="http://www.w3.org/2000/svg" width="1" height="1">'
+                    f'<!-- {digest} --></svg>\n').encode('ascii')
+        if fmt == "pdf":
+            return _stub_pdf(digest)
+        if fmt == "eps":
+            return (f"%!PS-Adobe-3.0 EPSF-3.0\n%%BoundingBox: 0 0 1 1\n"
+                    f"%%Title: {digest}\n%%EOF\n").encode('ascii')
+        raise ValueError(f"Stub renderer does not support {fmt}")
+
+def _stub_png(comment):
+    """Minimal 1x1 PNG carrying `comment` in a tEXt chunk"""
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0))
+            + chunk(b"tEXt", b"Comment\0" + comment.encode('ascii'))
+            + chunk(b"IDAT", zlib.compress(b"\x00\xff"))
+            + chunk(b"IEND", b""))
+
+def _stub_pdf(comment):
+    """Minimal one page PDF titled `comment`"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 1 1] >>",
+        b"<< /Title (" + comment.encode('ascii') + b") >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref)
+    return bytes(out)
+
+RENDERERS = {
+    HttpRenderer.name: HttpRenderer,
+    JarRenderer.name: JarRenderer,
+    StubRenderer.name: StubRenderer,
+}
+
+def create_renderer(args):
+    """Instantiate the renderer selected on the command line"""
+    if args.renderer == JarRenderer.name:
+        if not args.plantuml_jar:
+            raise SystemExit("The jar renderer needs --plantuml-jar or PLANTUML_JAR")
+        return JarRenderer(args.plantuml_jar, java=args.java)
+    if args.renderer == StubRenderer.name:
+        return StubRenderer()
+    rate_limiter = TokenBucket(args.rate_limit, args.burst) if args.rate_limit else None
+    return HttpRenderer(args.server_url, pool_size=args.pool_size or args.workers,
+                        retry=RetryPolicy(args.retries, max_retry_after=args.max_retry_after),
+                        rate_limiter=rate_limiter,
+                        post_threshold=args.post_threshold)
+
+def file_hash(path):
+    """SHA-256 of a file's contents, or None if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+class BuildManifest:
+    """Record of source hash, producer and output hashes per diagram, used to skip up-to-date renders
+    
+    The producer names the renderer and encoding an output came from, so a
+    stub or local render is not kept once the real server is used.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+    
+    def is_up_to_date(self, puml_file, source_hash, producer, fmt, output_file):
+        """Whether output_file was rendered from the current source by producer, like make"""
+        if not output_file.exists():
+            return False
+        entry = self.entries.get(puml_file.stem)
+        outputs = (entry or {}).get("outputs", {})
+        if fmt not in outputs:
+            # No record yet: fall back to comparing timestamps
+            return output_file.stat().st_mtime >= puml_file.stat().st_mtime
+        return (entry.get("source") == source_hash and entry.get("producer") == producer
+                and outputs[fmt] == file_hash(output_file))
+    
+    def record(self, puml_file, source_hash, producer, fmt, output_file):
+        """Remember the hashes of a freshly written output"""
+        output_hash = file_hash(output_file)
+        with self._lock:
+            entry = self.entries.get(puml_file.stem)
+            if (entry is None or entry.get("source") != source_hash
+                    or entry.get("producer") != producer or "outputs" not in entry):
+                # Outputs recorded for an older source or another renderer are stale
+                entry = self.entries[puml_file.stem] = {"source": source_hash, "producer": producer,
+                                                        "outputs": {}}
+            entry["outputs"][fmt] = output_hash
+    
+    def save(self):
+        """Write the manifest atomically next to the outputs"""
+        with self._lock:
+            fd, tmp_name = make_temp(self.path.parent)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_name, self.path)
+
+class Diagram:
+    """A .puml source read once and encoded at most once for all output formats"""
+    
+    def __init__(self, puml_file, level=DEFAULT_LEVEL, method=DEFLATE):
+        self.puml_file = puml_file
+        self.level = level
+        self.method = method
+        with open(puml_file, 'r', encoding='utf-8') as f:
+            self.text = f.read()
+        self.source_hash = hashlib.sha256(self.text.encode('utf-8')).hexdigest()
+    
+    def producer(self, renderer):
+        """Renderer and encoding settings an output of this diagram comes from"""
+        return f"{renderer.identity};{self.method}:{self.level}"
+    
+    @cached_property
+    def encoded(self):
+        """Encoded payload shared by every format of this diagram"""
+        return plantuml_encode(self.text, self.level, self.method)
+
+def render_output(diagram, fmt, output_dir, renderer, cache=None, manifest=None, force=False,
+                  timings=False):
+    """Produce one format of a diagram, return (outcome, report lines)"""
+    puml_file = diagram.puml_file
+    output_file = output_dir / f"{puml_file.stem}.{fmt}"
+    producer = diagram.producer(renderer)
+    if manifest and not force and manifest.is_up_to_date(puml_file, diagram.source_hash, producer,
+                                                          fmt, output_file):
+        return SKIPPED, [f"  - {output_file.name} is up to date"]
+    
+    # Reuse a previous render of identical diagram text
+    cache_key = DiagramCache.key(diagram.encoded, fmt, renderer.identity) if cache else None
+    if cache and cache.fetch(cache_key, fmt, output_file):
+        if manifest:
+            manifest.record(puml_file, diagram.source_hash, producer, fmt, output_file)
+        return CACHED, [f"  ✓ Copied {output_file.name} from cache"]
+    
+    try:
+        # Stream into a temp file renamed into place, so a crash never leaves a truncated output
+        write_atomic(output_file,
+                     lambda f: renderer.render(diagram.text, diagram.encoded, fmt, f), fmt)
+        if cache:
+            cache.store(cache_key, fmt, output_file)
+        if manifest:
+            manifest.record(puml_file, diagram.source_hash, producer, fmt, output_file)
+        
+        lines = [f"  ✓ Generated {output_file.name}"]
+        timing = renderer.last_timing() if timings else None
+        if timing:
+            lines.append(f"    connect {_ms(timing.connect)}, server {_ms(timing.server)}, "
+                         f"download {_ms(timing.download)}")
+        return RENDERED, lines
+    except (requests.RequestException, RuntimeError, ValueError, OSError) as e:
+        return FAILED, [f"  ✗ Error ({fmt}): {e}"]
+
+def generate_diagram(puml_file, output_dir, renderer, formats=DEFAULT_FORMATS,
+                     level=DEFAULT_LEVEL, method=DEFLATE, **options):
+    """Generate every requested format of one PlantUML file, return the outcome per format"""
+    diagram = Diagram(puml_file, level, method)
+    lines = [f"Processing {puml_file.name}..."]
+    outcomes = []
+    for fmt in formats:
+        outcome, output_lines = render_output(diagram, fmt, output_dir, renderer, **options)
+        outcomes.append(outcome)
+        lines.extend(output_lines)
+    log(*lines)
+    return outcomes
+
+def generate_all(puml_files, output_dir, renderer, formats=DEFAULT_FORMATS,
+                 workers=DEFAULT_WORKERS, level=DEFAULT_LEVEL, method=DEFLATE, **options):
+    """Render every (diagram, format) pair with at most `workers` in flight
+    
+    Returns a Counter of per-output outcomes and the number of diagrams
+    with at least one failed output.
+    """
+    if workers <= 1:
+        results = [generate_diagram(puml_file, output_dir, renderer, formats, level, method,
+                                    **options)
+                   for puml_file in puml_files]
+        return (Counter(outcome for result in results for outcome in result),
+                sum(1 for result in results if FAILED in result))
+    
+    outcomes = Counter()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Formats of the same diagram are fetched concurrently from one encoded payload
+        pending = {}
+        for puml_file in puml_files:
+            diagram = Diagram(puml_file, level, method)
+            pending[diagram] = [executor.submit(render_output, diagram, fmt, output_dir,
+                                                renderer, **options)
+                                for fmt in formats]
+        owner = {future: diagram for diagram, futures in pending.items() for future in futures}
+        remaining = {diagram: len(futures) for diagram, futures in pending.items()}
+        
+        # Report each diagram as a whole once its last format is done
+        for future in as_completed(owner):
+            diagram = owner[future]
+            remaining[diagram] -= 1
+            if remaining[diagram]:
+                continue
+            lines = [f"Processing {diagram.puml_file.name}..."]
+            diagram_outcomes = []
+            for format_future in pending.pop(diagram):
+                outcome, output_lines = format_future.result()
+                diagram_outcomes.append(outcome)
+                lines.extend(output_lines)
+            log(*lines)
+            outcomes.update(diagram_outcomes)
+            if FAILED in diagram_outcomes:
+                failed += 1
+    return outcomes, failed
+
+def parse_formats(value):
+    """argparse type for a comma separated list of output formats"""
+    formats = tuple(dict.fromkeys(fmt.strip().lower() for fmt in value.split(",") if fmt.strip()))
+    unknown = [fmt for fmt in formats if fmt not in SUPPORTED_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(
+            f"unsupported format(s) {', '.join(unknown) or value!r}, "
+            f"choose from {', '.join(SUPPORTED_FORMATS)}")
+    return formats
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate diagrams from PlantUML files")
+    parser.add_argument("--uml-dir", type=Path, default=DEFAULT_UML_DIR,
+                        help="directory containing .puml files")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="directory the rendered diagrams are written to")
+    parser.add_argument("-j", "--workers", type=int,
+                        default=int(os.environ.get("PLANTUML_WORKERS", DEFAULT_WORKERS)),
+                        help="maximum number of diagrams rendered concurrently "
+                             f"(default: {DEFAULT_WORKERS}, 1 renders serially)")
+    parser.add_argument("--formats", type=parse_formats, default=DEFAULT_FORMATS,
+                        help="comma separated output formats rendered in one pass, "
+                             f"any of {', '.join(SUPPORTED_FORMATS)} (default: png)")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="render every diagram even if its output is up to date")
+    
+    renderer_group = parser.add_argument_group("renderer")
+    renderer_group.add_argument("--renderer", choices=sorted(RENDERERS),
+                                default=os.environ.get("PLANTUML_RENDERER", DEFAULT_RENDERER),
+                                help=f"rendering backend (default: {DEFAULT_RENDERER})")
+    renderer_group.add_argument("--server-url", default=os.environ.get("PLANTUML_SERVER", DEFAULT_SERVER_URL),
+                                help="PlantUML server base URL for the http renderer")
+    renderer_group.add_argument("--compression-level", type=int, choices=range(10),
+                                default=DEFAULT_LEVEL, metavar="0-9",
+                                help=f"deflate level of the encoded diagram (default: {DEFAULT_LEVEL})")
+    renderer_group.add_argument("--encoding", choices=plantuml_encoding.METHODS, default=DEFLATE,
+                                help="deflate with PlantUML's base64 alphabet, or the ~h hex form")
+    renderer_group.add_argument("--post-threshold", type=int, default=DEFAULT_MAX_URL_LENGTH,
+                                metavar="CHARS",
+                                help="POST the diagram text instead of a GET URL when the encoded "
+                                     f"diagram is longer than this (default: {DEFAULT_MAX_URL_LENGTH})")
+    renderer_group.add_argument("--pool-size", type=int,
+                                help="keep-alive connections kept by the http renderer "
+                                     "(default: same as --workers)")
+    renderer_group.add_argument("--timings", action="store_true",
+                                help="report connection setup, server and download time per request")
+    renderer_group.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                                help="retries after connection errors, 429 and 5xx responses, "
+                                     f"with exponential backoff (default: {DEFAULT_RETRIES})")
+    renderer_group.add_argument("--max-retry-after", type=float, default=DEFAULT_MAX_RETRY_AFTER,
+                                metavar="SECONDS",
+                                help="longest Retry-After waited for before giving up on a diagram "
+                                     f"(default: {DEFAULT_MAX_RETRY_AFTER:.0f})")
+    renderer_group.add_argument("--rate-limit", type=float, metavar="RPS",
+                                default=float(os.environ.get("PLANTUML_RATE_LIMIT", 0)),
+                                help="maximum requests started per second, 0 for unlimited")
+    renderer_group.add_argument("--burst", type=int,
+                                help="requests allowed in a burst above --rate-limit")
+    renderer_group.add_argument("--plantuml-jar", default=os.environ.get("PLANTUML_JAR"),
+                                help="path to plantuml.jar for the jar renderer")
+    renderer_group.add_argument("--java", default=os.environ.get("JAVA", "java"),
+                                help="java executable used by the jar renderer")
+    
+    cache_group = parser.add_argument_group("render cache")
+    cache_group.add_argument("--cache-dir", type=Path,
+                             default=Path(os.environ.get("PLANTUML_CACHE_DIR", DEFAULT_CACHE_DIR)),
+                             help=f"directory of cached renders (default: {DEFAULT_CACHE_DIR})")
+    cache_group.add_argument("--cache-max-size", type=int, default=DEFAULT_CACHE_SIZE_MB, metavar="MB",
+                             help="evict least recently used renders above this size "
+                                  f"(default: {DEFAULT_CACHE_SIZE_MB})")
+    cache_group.add_argument("--no-cache", action="store_true",
+                             help="always render and never read or write the cache")
+    cache_group.add_argument("--prune-cache", action="store_true",
+                             help="evict renders down to --cache-max-size and exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function"""
-    uml_dir = Path("/home/claude/BudgetPlanner/Documentation/UML")
-    output_dir = Path("/home/claude/BudgetPlanner/Documentation/Images")
+    args = parse_args(argv)
+    cache = None if args.no_cache else DiagramCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
+    
+    if args.prune_cache:
+        if cache is None:
+            print("Render cache is disabled, nothing to prune")
+            return 0
+        removed, freed = cache.prune()
+        print(f"Pruned {removed} cached diagrams ({freed / 1024:.1f} KiB) from {cache.cache_dir}")
+        return 0
+    
+    uml_dir = args.uml_dir
+    output_dir = args.output_dir
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Find all .puml files
-    puml_files = list(uml_dir.glob("*.puml"))
+    puml_files = sorted(uml_dir.glob("*.puml"))
     
     if not puml_files:
         print("No .puml files found!")
-        return
+        return 0
     
     print(f"Found {len(puml_files)} PlantUML files")
     print("-" * 50)
     
-    success_count = 0
-    for puml_file in sorted(puml_files):
-        if generate_diagram(puml_file, output_dir):
-            success_count += 1
+    manifest = BuildManifest(output_dir / MANIFEST_NAME)
+    renderer = create_renderer(args)
+    try:
+        outcomes, failed = generate_all(puml_files, output_dir, renderer, formats=args.formats,
+                                        workers=args.workers, level=args.compression_level,
+                                        method=args.encoding, cache=cache, manifest=manifest,
+                                        force=args.force, timings=args.timings)
+        timing_lines = renderer.timing_summary() if args.timings else []
+    finally:
+        renderer.close()
+        manifest.save()
+    if cache:
+        cache.prune()
     
+    success_count = len(puml_files) - failed
     print("-" * 50)
+    print(f"Outputs rendered {outcomes[RENDERED]}, copied from cache {outcomes[CACHED]}, "
+          f"skipped {outcomes[SKIPPED]} up to date")
+    for line in timing_lines:
+        print(line)
     print(f"Successfully generated {success_count}/{len(puml_files)} diagrams")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
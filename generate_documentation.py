@@ -3,99 +3,100 @@
 Generate comprehensive project documentation PDF for Budget Planner
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from reportlab.platypus import (SimpleDocTemplate, Paragraph, Spacer, PageBreak,
-                                Table, TableStyle, Image, KeepTogether)
-from reportlab.lib import colors
+                                Table, Image, KeepTogether)
+from reportlab.platypus.tableofcontents import TableOfContents
+from reportlab import rl_config
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
+from xml.sax.saxutils import escape
+import argparse
+import hashlib
+import json
 import os
+import sys
+import tempfile
+import time
 
-def create_title_page(story, styles):
+try:
+    from pypdf import PdfWriter
+    from pypdf.generic import ArrayObject, NameObject
+except ImportError:
+    PdfWriter = None
+
+from build_profile import BuildProfiler, profile_call
+from cache_dirs import cache_location
+from csharp_scanner import SourceScanner
+from documentation_images import (DEFAULT_DPI, SVG_EXTENSIONS, SVG_SUPPORT, DrawingCache, ImageCache,
+                                   find_image)
+from documentation_tables import StreamingTable
+from documentation_theme import load_theme
+from git_history import GitError, count_commits, iter_commits
+from section_cache import SectionCache, fingerprint
+from test_inventory import FAILED, PASSED, SKIPPED, load_results, passed_cases, scan_tests
+
+# Write binary streams: ASCII85 makes embedded images 25% larger and, without
+# reportlab's C accelerators, encoding them dominates the build time
+rl_config.useA85 = 0
+
+# Heading styles listed in the table of contents, with their outline level
+TOC_LEVELS = {'Heading1': 0, 'Heading2': 1}
+
+class DocumentTemplate(SimpleDocTemplate):
+    """Document template that reports headings to the TOC and the PDF outline"""
+    
+    def __init__(self, filename, key_prefix="", **kw):
+        super().__init__(filename, **kw)
+        # Keeps bookmark keys unique when separately built sections are merged
+        self.key_prefix = key_prefix
+    
+    def beforeDocument(self):
+        self._heading_count = 0
+        self.headings = []
+    
+    def afterFlowable(self, flowable):
+        if not isinstance(flowable, Paragraph) or flowable.style.name not in TOC_LEVELS:
+            return
+        level = TOC_LEVELS[flowable.style.name]
+        text = flowable.getPlainText()
+        self._heading_count += 1
+        key = f"{self.key_prefix}heading-{self._heading_count}"
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(text, key, level=level, closed=level > 0)
+        self.headings.append((level, text, self.page, key))
+        self.notify('TOCEntry', (level, text, self.page, key))
+
+def create_title_page(styles, project):
     """Create title page"""
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=colors.HexColor('#1a5490'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontSize=16,
-        textColor=colors.HexColor('#2c5aa0'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    story.append(Spacer(1, 2*inch))
-    story.append(Paragraph("LIČNI PLANER BUDŽETA", title_style))
-    story.append(Paragraph("WPF MVVM Aplikacija sa Entity Framework Core", subtitle_style))
-    story.append(Spacer(1, 0.5*inch))
-    
-    info_style = ParagraphStyle(
-        'Info',
-        parent=styles['Normal'],
-        fontSize=12,
-        alignment=TA_CENTER
-    )
-    
-    story.append(Paragraph(f"Datum: {datetime.now().strftime('%d.%m.%Y.')}", info_style))
-    story.append(Spacer(1, 0.3*inch))
-    story.append(Paragraph("Projektna dokumentacija", info_style))
-    story.append(PageBreak())
+    yield Spacer(1, 2*inch)
+    yield Paragraph(project.title, styles['CustomTitle'])
+    yield Paragraph(project.subtitle, styles['Subtitle'])
+    yield Spacer(1, 0.5*inch)
+    
+    yield Paragraph(f"Datum: {datetime.now().strftime('%d.%m.%Y.')}", styles['Info'])
+    yield Spacer(1, 0.3*inch)
+    yield Paragraph("Projektna dokumentacija", styles['Info'])
+    yield PageBreak()
 
-def create_toc(story, styles):
+def create_toc(styles, project):
     """Create table of contents"""
-    story.append(Paragraph("Sadržaj", styles['Heading1']))
-    story.append(Spacer(1, 12))
-    
-    toc_items = [
-        ("1. Uvod", "3"),
-        ("2. Analiza", "4"),
-        ("   2.1. Use Case Dijagram", "4"),
-        ("   2.2. Opisi Use Case-ova", "5"),
-        ("   2.3. Korisničke Uloge", "7"),
-        ("3. Modelovanje", "8"),
-        ("   3.1. Dijagram Klasa", "8"),
-        ("   3.2. Dijagram Paketa", "9"),
-        ("   3.3. Dijagrami Sekvenci", "10"),
-        ("4. Implementacija", "13"),
-        ("   4.1. MVVM Arhitektura", "13"),
-        ("   4.2. Entity Framework Core", "15"),
-        ("   4.3. Dizajn Šabloni", "16"),
-        ("   4.4. Serijalizacija", "18"),
-        ("   4.5. PDF Izveštaji", "19"),
-        ("5. Testiranje", "20"),
-        ("6. Git i Verzionisanje", "22"),
-        ("7. Zaključak", "23"),
-    ]
-    
-    toc_style = ParagraphStyle(
-        'TOC',
-        parent=styles['Normal'],
-        fontSize=11,
-        leftIndent=0,
-        spaceAfter=6
-    )
+    yield Paragraph("Sadržaj", styles['TOCHeading'])
+    yield Spacer(1, 12)
     
-    for item, page in toc_items:
-        dots = "." * (80 - len(item) - len(page))
-        story.append(Paragraph(f"{item} {dots} {page}", toc_style))
+    # Entries and page numbers are filled in by DocumentTemplate while laying out
+    toc = TableOfContents(dotsMinLevel=0)
+    toc.levelStyles = [styles['TOC1'], styles['TOC2']]
+    yield toc
     
-    story.append(PageBreak())
+    yield PageBreak()
 
-def create_introduction(story, styles):
+def create_introduction(styles, project):
     """Create introduction section"""
-    story.append(Paragraph("1. Uvod", styles['Heading1']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("1. Uvod", styles['Heading1'])
+    yield Spacer(1, 12)
     
     intro_text = """
     <b>Lični Planer Budžeta</b> je desktop aplikacija razvijena koristeći Windows Presentation 
@@ -103,17 +104,17 @@ def create_introduction(story, styles):
     svojim ličnim finansijama kroz praćenje prihoda i rashoda, kategorisanje transakcija, 
     postavljanje budžeta i generisanje detaljnih izveštaja.
     """
-    story.append(Paragraph(intro_text, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(intro_text, styles['Normal'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("1.1. Cilj Projekta", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("1.1. Cilj Projekta", styles['Heading2'])
+    yield Spacer(1, 6)
     
     goal_text = """
     Cilj ovog projekta je razvoj potpuno funkcionalne desktop aplikacije koja demonstrira:
     """
-    story.append(Paragraph(goal_text, styles['Normal']))
-    story.append(Spacer(1, 6))
+    yield Paragraph(goal_text, styles['Normal'])
+    yield Spacer(1, 6)
     
     goals = [
         "Implementaciju MVVM arhitekturnog obrasca",
@@ -126,11 +127,11 @@ def create_introduction(story, styles):
     ]
     
     for goal in goals:
-        story.append(Paragraph(f"• {goal}", styles['Normal']))
-    story.append(Spacer(1, 12))
+        yield Paragraph(f"• {goal}", styles['Normal'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("1.2. Tehnologije", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("1.2. Tehnologije", styles['Heading2'])
+    yield Spacer(1, 6)
     
     tech_data = [
         ['Kategorija', 'Tehnologija'],
@@ -145,45 +146,37 @@ def create_introduction(story, styles):
     ]
     
     tech_table = Table(tech_data, colWidths=[2*inch, 3.5*inch])
-    tech_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(tech_table)
-    story.append(PageBreak())
+    tech_table.setStyle(styles.tables['overview'])
+    
+    yield tech_table
+    yield PageBreak()
 
-def create_analysis_section(story, styles):
+def create_analysis_section(styles, project):
     """Create analysis section"""
-    story.append(Paragraph("2. Analiza", styles['Heading1']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("2. Analiza", styles['Heading1'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("2.1. Use Case Dijagram", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("2.1. Use Case Dijagram", styles['Heading2'])
+    yield Spacer(1, 6)
     
     uml_note = """
-    <i>Napomena: PlantUML dijagrami se nalaze u folderu Documentation/UML. 
-    Dijagrami mogu biti pregledani koristeći PlantUML preglednike ili online alate 
-    na adresi: http://www.plantuml.com/plantuml</i>
+    <i>Napomena: Izvorni PlantUML (.puml) fajlovi svih dijagrama u ovom dokumentu nalaze se 
+    u folderu Documentation/UML.</i>
     """
-    story.append(Paragraph(uml_note, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(uml_note, styles['Normal'])
+    yield Spacer(1, 12)
     
     usecase_desc = """
     Use Case dijagram prikazuje sve glavne funkcionalnosti sistema koje su dostupne korisniku. 
     Sistem podržava 8 glavnih slučajeva upotrebe sa dodatnim proširenjima i uključivanjima.
     """
-    story.append(Paragraph(usecase_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(usecase_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("Glavni Use Case-ovi:", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield from create_diagram(project, "UseCaseDiagram", "Use Case dijagram", styles)
+    
+    yield Paragraph("Glavni Use Case-ovi:", styles['Heading3'])
+    yield Spacer(1, 6)
     
     usecases = [
         "UC1: Registracija/Login - Autentifikacija korisnika",
@@ -197,16 +190,16 @@ def create_analysis_section(story, styles):
     ]
     
     for uc in usecases:
-        story.append(Paragraph(f"• {uc}", styles['Normal']))
+        yield Paragraph(f"• {uc}", styles['Normal'])
     
-    story.append(PageBreak())
+    yield PageBreak()
     
-    story.append(Paragraph("2.2. Opisi Use Case-ova", styles['Heading2']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("2.2. Opisi Use Case-ova", styles['Heading2'])
+    yield Spacer(1, 12)
     
     # UC1
-    story.append(Paragraph("UC1: Registracija/Login", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("UC1: Registracija/Login", styles['Heading3'])
+    yield Spacer(1, 6)
     
     uc1_data = [
         ['Atribut', 'Opis'],
@@ -221,23 +214,14 @@ def create_analysis_section(story, styles):
     ]
     
     uc1_table = Table(uc1_data, colWidths=[1.5*inch, 4*inch])
-    uc1_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(uc1_table)
-    story.append(Spacer(1, 12))
+    uc1_table.setStyle(styles.tables['attributes'])
+    
+    yield uc1_table
+    yield Spacer(1, 12)
     
     # UC3
-    story.append(Paragraph("UC3: Dodavanje Transakcija", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("UC3: Dodavanje Transakcija", styles['Heading3'])
+    yield Spacer(1, 6)
     
     uc3_data = [
         ['Atribut', 'Opis'],
@@ -256,23 +240,14 @@ def create_analysis_section(story, styles):
     ]
     
     uc3_table = Table(uc3_data, colWidths=[1.5*inch, 4*inch])
-    uc3_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(uc3_table)
-    story.append(Spacer(1, 12))
+    uc3_table.setStyle(styles.tables['attributes'])
+    
+    yield uc3_table
+    yield Spacer(1, 12)
     
     # UC6
-    story.append(Paragraph("UC6: Generisanje Izveštaja", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("UC6: Generisanje Izveštaja", styles['Heading3'])
+    yield Spacer(1, 6)
     
     uc6_data = [
         ['Atribut', 'Opis'],
@@ -286,49 +261,157 @@ def create_analysis_section(story, styles):
     ]
     
     uc6_table = Table(uc6_data, colWidths=[1.5*inch, 4*inch])
-    uc6_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(uc6_table)
-    story.append(PageBreak())
-    
-    story.append(Paragraph("2.3. Korisničke Uloge", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    uc6_table.setStyle(styles.tables['attributes'])
+    
+    yield uc6_table
+    yield PageBreak()
+    
+    yield Paragraph("2.3. Korisničke Uloge", styles['Heading2'])
+    yield Spacer(1, 6)
     
     roles_text = """
     Aplikacija podržava samo jednu korisničku ulogu - <b>Korisnik</b>. Svaki korisnik ima pristup 
     svim funkcionalnostima aplikacije nakon autentifikacije. Podaci su izolovani po korisniku - 
     svaki korisnik vidi samo svoje transakcije, kategorije i budžete.
     """
-    story.append(Paragraph(roles_text, styles['Normal']))
-    story.append(PageBreak())
+    yield Paragraph(roles_text, styles['Normal'])
+    yield PageBreak()
+
+def long_table(header, rows, col_widths, styles, style='data'):
+    """Table laid out a page at a time, header repeated on every page
+    
+    `rows` is a list, or a function returning a fresh row iterator; rows are
+    only turned into flowables as pages are filled.
+    """
+    return StreamingTable(header, rows, col_widths, styles.tables[style])
+
+@lru_cache(maxsize=None)
+def image_cache():
+    """One image cache per process, shared by every project of a batch"""
+    return ImageCache()
+
+@lru_cache(maxsize=None)
+def drawing_cache():
+    """One drawing cache per process, shared by every project of a batch"""
+    return DrawingCache()
+
+def diagram_flowable(project, name):
+    """Vector drawing of a diagram from its SVG when possible, else a resampled image"""
+    if project.vector_diagrams and SVG_SUPPORT:
+        path = find_image(project.diagram_dirs, name, SVG_EXTENSIONS)
+        if path is not None:
+            return drawing_cache().scaled(path, DIAGRAM_MAX_WIDTH, DIAGRAM_MAX_HEIGHT)
+    path = find_image(project.diagram_dirs, name)
+    if path is None:
+        return None
+    image_path, width, height = image_cache().scaled(path, DIAGRAM_MAX_WIDTH, DIAGRAM_MAX_HEIGHT,
+                                                     project.image_dpi)
+    return Image(image_path, width, height)
 
-def create_modeling_section(story, styles):
+def create_diagram(project, name, caption, styles):
+    """Embedded diagram with its caption, nothing when the project has no image of it"""
+    diagram = diagram_flowable(project, name)
+    if diagram is None:
+        print(f"  No {name} image in {', '.join(project.diagram_dirs)}")
+        return
+    diagram.hAlign = 'CENTER'
+    yield KeepTogether([diagram, Spacer(1, 6), Paragraph(caption, styles['Caption'])])
+    yield Spacer(1, 12)
+
+@lru_cache(maxsize=None)
+def source_scanner():
+    """One scanner per process, so a batch parses each source file at most once"""
+    return SourceScanner()
+
+def scan_sources(project):
+    """Types per scanned source directory and DbSet entities, all empty without sources"""
+    scanner = source_scanner()
+    types = scanner.scan(project.source_dir)
+    db_sets = scanner.db_sets(project.source_dir)
+    scanner.save()
+    return types, db_sets
+
+def scan_models(project):
+    """Model types and DbSet entities of the project, both empty without sources"""
+    types, db_sets = scan_sources(project)
+    return types["Models"], db_sets
+
+def package_description(description, types, styles):
+    """Package table cell: the description followed by the scanned type names, if any"""
+    if not types:
+        return description
+    names = ", ".join(sorted(info.name for info in types))
+    return Paragraph(f"{escape(description)}: {escape(names)}", styles['TableCell'])
+
+def first_sentence(text):
+    """First sentence of a doc comment summary, without the full stop"""
+    return text.split(". ")[0].rstrip(".")
+
+def by_hierarchy(types):
+    """Types with each base class followed by the classes deriving from it"""
+    names = {info.name for info in types}
+    derived = {}
+    for info in types:
+        if info.bases and info.bases[0] in names:
+            derived.setdefault(info.bases[0], []).append(info)
+    ordered = []
+    # Depth first without recursion, deep hierarchies would hit the recursion limit
+    pending = [info for info in reversed(types) if not info.bases or info.bases[0] not in names]
+    while pending:
+        info = pending.pop()
+        ordered.append(info)
+        pending.extend(reversed(derived.get(info.name, [])))
+    return ordered
+
+def model_rows(models, styles):
+    """Rows of the class table: name, kind and the summary from the doc comment"""
+    names = {info.name for info in models}
+    for info in by_hierarchy(models):
+        kind = 'Apstraktna' if 'abstract' in info.modifiers else 'Konkretna'
+        description = escape(first_sentence(info.summary))
+        if info.bases and info.bases[0] in names:
+            description += f" (nasleđuje {info.bases[0]})"
+        yield [info.name, kind, Paragraph(description, styles['TableCell'])]
+
+def entity_descriptions(models, db_sets):
+    """One line per DbSet entity listing its mapped (non-navigation) properties"""
+    types = {info.name: info for info in models}
+    entities = [types[entity] for entity, _ in db_sets if entity in types]
+    lines = []
+    for info in by_hierarchy(entities):
+        columns = ", ".join(name for _, name, navigation in info.properties if not navigation)
+        if info.bases and info.bases[0] in types:
+            description = f"Nasleđuje {info.bases[0]}, TPH - Table Per Hierarchy"
+        elif 'abstract' in info.modifiers:
+            description = "Apstraktna klasa"
+        else:
+            description = escape(first_sentence(info.summary))
+        lines.append(f"<b>{info.name}:</b> {description} ({columns})")
+    return lines
+
+def create_modeling_section(styles, project):
     """Create modeling section"""
-    story.append(Paragraph("3. Modelovanje", styles['Heading1']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("3. Modelovanje", styles['Heading1'])
+    yield Spacer(1, 12)
+    
+    yield Paragraph("3.1. Dijagram Klasa", styles['Heading2'])
+    yield Spacer(1, 6)
     
-    story.append(Paragraph("3.1. Dijagram Klasa", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    types, _ = scan_sources(project)
+    models = types["Models"]
     
-    class_desc = """
+    class_desc = f"""
     Dijagram klasa prikazuje strukturu aplikacije sa svim glavnim klasama, njihovim atributima, 
-    metodama i relacijama. Aplikacija sadrži 9 glavnih klasa sa implementacijom nasleđivanja, 
+    metodama i relacijama. Aplikacija sadrži {len(models) or 9} glavnih klasa sa implementacijom nasleđivanja, 
     kompozicije i agregacije.
     """
-    story.append(Paragraph(class_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(class_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("Glavne Klase:", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield from create_diagram(project, "ClassDiagram", "Dijagram klasa", styles)
+    
+    yield Paragraph("Glavne Klase:", styles['Heading3'])
+    yield Spacer(1, 6)
     
     classes_data = [
         ['Klasa', 'Tip', 'Opis'],
@@ -342,23 +425,17 @@ def create_modeling_section(story, styles):
         ['Budget', 'Konkretna', 'Mesečni budžet korisnika'],
         ['MonthlyReport', 'Konkretna', 'Mesečni finansijski izveštaj']
     ]
+    if models:
+        class_rows = partial(model_rows, models, styles)
+    else:
+        print(f"  No models found under {project.source_dir}, using the built-in class list")
+        class_rows = classes_data[1:]
     
-    classes_table = Table(classes_data, colWidths=[1.5*inch, 1.2*inch, 2.8*inch])
-    classes_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(classes_table)
-    story.append(Spacer(1, 12))
+    yield long_table(classes_data[0], class_rows, [1.5*inch, 1.2*inch, 2.8*inch], styles)
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("Relacije:", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("Relacije:", styles['Heading3'])
+    yield Spacer(1, 6)
     
     relations = [
         "<b>Nasleđivanje:</b> Income i Expense nasleđuju Transaction",
@@ -370,58 +447,54 @@ def create_modeling_section(story, styles):
     ]
     
     for rel in relations:
-        story.append(Paragraph(f"• {rel}", styles['Normal']))
+        yield Paragraph(f"• {rel}", styles['Normal'])
     
-    story.append(PageBreak())
+    yield PageBreak()
     
-    story.append(Paragraph("3.2. Dijagram Paketa", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("3.2. Dijagram Paketa", styles['Heading2'])
+    yield Spacer(1, 6)
     
     package_desc = """
     Dijagram paketa prikazuje organizaciju projekta u logičke celine (namespaces). 
     Projekat je organizovan prema MVVM arhitekturi sa jasnom separacijom odgovornosti.
     """
-    story.append(Paragraph(package_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(package_desc, styles['Normal'])
+    yield Spacer(1, 12)
+    
+    yield from create_diagram(project, "PackageDiagram", "Dijagram paketa", styles)
     
     packages_data = [
         ['Paket', 'Opis'],
         ['Models', 'Domenski modeli (entiteti baze podataka)'],
-        ['ViewModels', 'ViewModel klase sa logikom prezentacije'],
+        ['ViewModels', package_description('ViewModel klase sa logikom prezentacije',
+                                           types["ViewModels"], styles)],
         ['Views', 'XAML prikazi korisničkog interfejsa'],
-        ['Services', 'Servisni sloj (Repository, Factory, Export, Report)'],
+        ['Services', package_description('Servisni sloj (Repository, Factory, Export, Report)',
+                                         types["Services"], styles)],
         ['Data', 'DbContext i konfiguracija baze'],
         ['Commands', 'ICommand implementacije (RelayCommand)'],
         ['Helpers', 'Helper klase (Converters, Extensions)']
     ]
     
     packages_table = Table(packages_data, colWidths=[1.5*inch, 4*inch])
-    packages_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(packages_table)
-    story.append(PageBreak())
-    
-    story.append(Paragraph("3.3. Dijagrami Sekvenci", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    packages_table.setStyle(styles.tables['data'])
+    
+    yield packages_table
+    yield PageBreak()
+    
+    yield Paragraph("3.3. Dijagrami Sekvenci", styles['Heading2'])
+    yield Spacer(1, 6)
     
     sequence_desc = """
     Dijagrami sekvenci prikazuju interakcije između objekata tokom izvršavanja određenih 
     use case-ova. Implementirana su tri dijagrama sekvenci koja pokrivaju ključne funkcionalnosti.
     """
-    story.append(Paragraph(sequence_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(sequence_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     # Login Sequence
-    story.append(Paragraph("3.3.1. Login Sekvenca", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("3.3.1. Login Sekvenca", styles['Heading3'])
+    yield Spacer(1, 6)
     
     login_seq = """
     <b>Učesnici:</b> Korisnik, LoginView, LoginViewModel, Repository, BudgetDbContext, UserSession
@@ -436,12 +509,14 @@ def create_modeling_section(story, styles):
     7. LoginViewModel postavlja UserSession.CurrentUser<br/>
     8. LoginView prikazuje MainView
     """
-    story.append(Paragraph(login_seq, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(login_seq, styles['Normal'])
+    yield Spacer(1, 12)
+    
+    yield from create_diagram(project, "LoginSequence", "Dijagram sekvence: Login sekvenca", styles)
     
     # Add Transaction Sequence
-    story.append(Paragraph("3.3.2. Dodavanje Transakcije", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("3.3.2. Dodavanje Transakcije", styles['Heading3'])
+    yield Spacer(1, 6)
     
     add_trans_seq = """
     <b>Učesnici:</b> Korisnik, TransactionView, TransactionViewModel, TransactionFactory, 
@@ -459,12 +534,14 @@ def create_modeling_section(story, styles):
     9. ViewModel osvežava listu transakcija (Observer pattern)<br/>
     10. View se ažurira kroz data binding
     """
-    story.append(Paragraph(add_trans_seq, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(add_trans_seq, styles['Normal'])
+    yield Spacer(1, 12)
+    
+    yield from create_diagram(project, "AddTransactionSequence", "Dijagram sekvence: Dodavanje transakcije", styles)
     
     # Generate Report Sequence
-    story.append(Paragraph("3.3.3. Generisanje Izveštaja", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("3.3.3. Generisanje Izveštaja", styles['Heading3'])
+    yield Spacer(1, 6)
     
     report_seq = """
     <b>Učesnici:</b> Korisnik, MainView, MainViewModel, ReportService, Repository, 
@@ -482,23 +559,26 @@ def create_modeling_section(story, styles):
     9. ExportService.ExportReportToPdf() kreira PDF dokument<br/>
     10. Sistem čuva PDF fajl na disk
     """
-    story.append(Paragraph(report_seq, styles['Normal']))
-    story.append(PageBreak())
+    yield Paragraph(report_seq, styles['Normal'])
+    yield Spacer(1, 12)
+    
+    yield from create_diagram(project, "GenerateReportSequence", "Dijagram sekvence: Generisanje izveštaja", styles)
+    yield PageBreak()
 
-def create_implementation_section(story, styles):
+def create_implementation_section(styles, project):
     """Create implementation section"""
-    story.append(Paragraph("4. Implementacija", styles['Heading1']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("4. Implementacija", styles['Heading1'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("4.1. MVVM Arhitektura", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.1. MVVM Arhitektura", styles['Heading2'])
+    yield Spacer(1, 6)
     
     mvvm_desc = """
     Aplikacija je implementirana striktno prema MVVM (Model-View-ViewModel) arhitekturnom obrascu. 
     Ovaj obrazac omogućava jasnu separaciju odgovornosti i olakšava testiranje i održavanje koda.
     """
-    story.append(Paragraph(mvvm_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(mvvm_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     mvvm_layers = [
         [
@@ -526,31 +606,15 @@ def create_implementation_section(story, styles):
     ]
     
     mvvm_table = Table(mvvm_layers, colWidths=[1.2*inch, 4.3*inch])
-    mvvm_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f4f8')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.HexColor('#f8f8f8'), colors.white, colors.HexColor('#f8f8f8')])
-    ]))
-    
-    story.append(mvvm_table)
-    story.append(Spacer(1, 12))
-    
-    story.append(Paragraph("Primeri implementacije:", styles['Heading3']))
-    story.append(Spacer(1, 6))
-    
-    code_style = ParagraphStyle(
-        'Code',
-        parent=styles['Normal'],
-        fontName='Courier',
-        fontSize=8,
-        leftIndent=20,
-        textColor=colors.HexColor('#2c5aa0'),
-        backColor=colors.HexColor('#f5f5f5')
-    )
+    mvvm_table.setStyle(styles.tables['layers'])
+    
+    yield mvvm_table
+    yield Spacer(1, 12)
+    
+    yield Paragraph("Primeri implementacije:", styles['Heading3'])
+    yield Spacer(1, 6)
+    
+    code_style = styles['CodeBlock']
     
     viewmodel_code = """
     public class TransactionViewModel : ViewModelBase
@@ -574,20 +638,20 @@ def create_implementation_section(story, styles):
         }
     }
     """
-    story.append(Paragraph("ViewModelBase sa INotifyPropertyChanged:", code_style))
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(viewmodel_code, code_style))
-    story.append(PageBreak())
+    yield Paragraph("ViewModelBase sa INotifyPropertyChanged:", code_style)
+    yield Spacer(1, 6)
+    yield Paragraph(viewmodel_code, code_style)
+    yield PageBreak()
     
-    story.append(Paragraph("4.2. Entity Framework Core", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.2. Entity Framework Core", styles['Heading2'])
+    yield Spacer(1, 6)
     
     ef_desc = """
     Entity Framework Core je korišćen kao ORM (Object-Relational Mapping) za pristup SQLite bazi 
     podataka. Implementiran je Code-First pristup sa migracijama.
     """
-    story.append(Paragraph(ef_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(ef_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     ef_entities = [
         "<b>User:</b> Korisnik sistema (Id, Username, PasswordHash, Email, CreatedAt)",
@@ -598,11 +662,12 @@ def create_implementation_section(story, styles):
         "<b>Budget:</b> Mesečni budžet (Id, Month, Year, PlannedAmount, UserId, CategoryId)",
         "<b>MonthlyReport:</b> Izveštaj (Id, Month, Year, TotalIncome, TotalExpense, Balance)"
     ]
+    ef_entities = entity_descriptions(*scan_models(project)) or ef_entities
     
     for entity in ef_entities:
-        story.append(Paragraph(f"• {entity}", styles['Normal']))
+        yield Paragraph(f"• {entity}", styles['Normal'])
     
-    story.append(Spacer(1, 12))
+    yield Spacer(1, 12)
     
     dbcontext_code = """
     public class BudgetDbContext : DbContext
@@ -628,23 +693,23 @@ def create_implementation_section(story, styles):
         }
     }
     """
-    story.append(Paragraph("BudgetDbContext konfiguracija:", code_style))
-    story.append(Spacer(1, 6))
-    story.append(Paragraph(dbcontext_code, code_style))
-    story.append(PageBreak())
+    yield Paragraph("BudgetDbContext konfiguracija:", code_style)
+    yield Spacer(1, 6)
+    yield Paragraph(dbcontext_code, code_style)
+    yield PageBreak()
     
-    story.append(Paragraph("4.3. Dizajn Šabloni", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.3. Dizajn Šabloni", styles['Heading2'])
+    yield Spacer(1, 6)
     
     patterns_desc = """
     U aplikaciji su implementirana dva dizajn šablona prema zahtevima projekta:
     """
-    story.append(Paragraph(patterns_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(patterns_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     # Singleton Pattern
-    story.append(Paragraph("4.3.1. Singleton Pattern (Kreacioni)", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.3.1. Singleton Pattern (Kreacioni)", styles['Heading3'])
+    yield Spacer(1, 6)
     
     singleton_desc = """
     <b>Klasa:</b> UserSession<br/>
@@ -652,8 +717,8 @@ def create_implementation_section(story, styles):
     Koristi se za čuvanje trenutno ulogovanog korisnika.<br/>
     <b>Implementacija:</b> Thread-safe Singleton sa lazy initialization.
     """
-    story.append(Paragraph(singleton_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(singleton_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     singleton_code = """
     public class UserSession
@@ -669,12 +734,12 @@ def create_implementation_section(story, styles):
         private UserSession() { }
     }
     """
-    story.append(Paragraph(singleton_code, code_style))
-    story.append(Spacer(1, 12))
+    yield Paragraph(singleton_code, code_style)
+    yield Spacer(1, 12)
     
     # Factory Pattern
-    story.append(Paragraph("4.3.2. Factory Pattern (Kreacioni)", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.3.2. Factory Pattern (Kreacioni)", styles['Heading3'])
+    yield Spacer(1, 6)
     
     factory_desc = """
     <b>Klasa:</b> TransactionFactory<br/>
@@ -682,8 +747,8 @@ def create_implementation_section(story, styles):
     Enkapsulira logiku kreiranja objekata.<br/>
     <b>Prednost:</b> Centralizovano kreiranje objekata, laka proširivost.
     """
-    story.append(Paragraph(factory_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(factory_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     factory_code = """
     public class TransactionFactory
@@ -715,12 +780,12 @@ def create_implementation_section(story, styles):
         }
     }
     """
-    story.append(Paragraph(factory_code, code_style))
-    story.append(PageBreak())
+    yield Paragraph(factory_code, code_style)
+    yield PageBreak()
     
     # Observer Pattern
-    story.append(Paragraph("4.3.3. Observer Pattern (Ponašajni)", styles['Heading3']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.3.3. Observer Pattern (Ponašajni)", styles['Heading3'])
+    yield Spacer(1, 6)
     
     observer_desc = """
     <b>Implementacija:</b> INotifyPropertyChanged interfejs u ViewModelBase<br/>
@@ -728,8 +793,8 @@ def create_implementation_section(story, styles):
     ažuriranje UI-a.<br/>
     <b>Mehanizam:</b> PropertyChanged event koji se aktivira pri promeni svojstava.
     """
-    story.append(Paragraph(observer_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(observer_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     observer_code = """
     public abstract class ViewModelBase : INotifyPropertyChanged
@@ -753,18 +818,18 @@ def create_implementation_section(story, styles):
         }
     }
     """
-    story.append(Paragraph(observer_code, code_style))
-    story.append(PageBreak())
+    yield Paragraph(observer_code, code_style)
+    yield PageBreak()
     
-    story.append(Paragraph("4.4. Serijalizacija", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.4. Serijalizacija", styles['Heading2'])
+    yield Spacer(1, 6)
     
     serialization_desc = """
     Aplikacija podržava serijalizaciju i deserijalizaciju podataka u JSON i XML formatima. 
     Implementiran je ExportService koji omogućava izvoz i uvoz podataka.
     """
-    story.append(Paragraph(serialization_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(serialization_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     json_code = """
     // JSON Serijalizacija
@@ -788,18 +853,18 @@ def create_implementation_section(story, styles):
         serializer.Serialize(writer, transactions);
     }
     """
-    story.append(Paragraph(json_code, code_style))
-    story.append(Spacer(1, 12))
+    yield Paragraph(json_code, code_style)
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("4.5. PDF Izveštaji", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("4.5. PDF Izveštaji", styles['Heading2'])
+    yield Spacer(1, 6)
     
     pdf_desc = """
     Za generisanje PDF izveštaja koristi se iText7 biblioteka. ReportService kreira mesečne 
     izveštaje sa statistikom prihoda i rashoda, koje ExportService konvertuje u PDF format.
     """
-    story.append(Paragraph(pdf_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(pdf_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     pdf_code = """
     public void ExportReportToPdf(MonthlyReport report, string filePath)
@@ -836,23 +901,64 @@ def create_implementation_section(story, styles):
         document.Close();
     }
     """
-    story.append(Paragraph(pdf_code, code_style))
-    story.append(PageBreak())
+    yield Paragraph(pdf_code, code_style)
+    yield PageBreak()
+
+OUTCOME_LABELS = {PASSED: 'Prošao', FAILED: 'Pao', SKIPPED: 'Preskočen'}
+
+def test_class_rows(test_classes, results, styles):
+    """Rows of the test class table, with a passed column when results are known
+    
+    Both counts are of data rows, so a [DataRow] test counts once per row.
+    """
+    for test_class in test_classes:
+        cases = sum(method.cases for method in test_class.methods)
+        row = [test_class.name, str(cases)]
+        if results:
+            passed = sum(passed_cases(method, results.get((test_class.name, method.name)))
+                         for method in test_class.methods)
+            row.append(f"{passed}/{cases}")
+        row.append(Paragraph(escape(first_sentence(test_class.summary)), styles['TableCell']))
+        yield row
+
+def test_result_rows(test_classes, results, styles):
+    """Rows of the per-test results table"""
+    for test_class in test_classes:
+        for method in test_class.methods:
+            result = results.get((test_class.name, method.name))
+            name = Paragraph(f"{test_class.name}.{method.name}", styles['TableCell'])
+            if result:
+                yield [name, OUTCOME_LABELS[result.outcome], f"{result.duration * 1000:.0f} ms"]
+            else:
+                yield [name, 'Nije pokrenut', '']
+
+def scan_test_classes(project):
+    """Test classes of the project, empty without a test directory"""
+    return scan_tests(project.test_dir) if os.path.isdir(project.test_dir) else []
 
-def create_testing_section(story, styles):
+def count_tests(test_classes):
+    """Number of tests, each data row of a data-driven test counted separately"""
+    return sum(method.cases for test_class in test_classes for method in test_class.methods)
+
+def create_testing_section(styles, project):
     """Create testing section"""
-    story.append(Paragraph("5. Testiranje", styles['Heading1']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("5. Testiranje", styles['Heading1'])
+    yield Spacer(1, 12)
+    
+    test_classes = scan_test_classes(project)
+    results = load_results(project.test_results) if project.test_results else {}
     
     testing_desc = """
     Implementirano je jedinično testiranje (unit testing) kritičnih komponenti aplikacije koristeći 
     MSTest framework. Testovi pokrivaju ViewModel logiku, Factory pattern i Singleton pattern.
     """
-    story.append(Paragraph(testing_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    if test_classes:
+        testing_desc += f" Ukupan broj testova: {count_tests(test_classes)}, broj test klasa: {len(test_classes)}."
+    yield Paragraph(testing_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("5.1. Test Klase", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("5.1. Test Klase", styles['Heading2'])
+    yield Spacer(1, 6)
     
     tests_data = [
         ['Test Klasa', 'Broj Testova', 'Pokriva'],
@@ -861,32 +967,32 @@ def create_testing_section(story, styles):
         ['UserSessionTests', '3', 'Singleton pattern, autentifikaciju'],
     ]
     
-    tests_table = Table(tests_data, colWidths=[2*inch, 1.3*inch, 2.2*inch])
-    tests_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-    ]))
-    
-    story.append(tests_table)
-    story.append(Spacer(1, 12))
-    
-    story.append(Paragraph("5.2. Primeri Testova", styles['Heading2']))
-    story.append(Spacer(1, 6))
-    
-    code_style = ParagraphStyle(
-        'Code',
-        parent=styles['Normal'],
-        fontName='Courier',
-        fontSize=8,
-        leftIndent=20,
-        textColor=colors.HexColor('#2c5aa0'),
-        backColor=colors.HexColor('#f5f5f5')
-    )
+    if not test_classes:
+        print(f"  No test classes found under {project.test_dir}, using the built-in test list")
+        tests_table = Table(tests_data, colWidths=[2*inch, 1.3*inch, 2.2*inch])
+        tests_table.setStyle(styles.tables['data'])
+        yield tests_table
+    elif results:
+        yield long_table(['Test Klasa', 'Testova', 'Prošlo', 'Pokriva'],
+                         partial(test_class_rows, test_classes, results, styles),
+                         [2*inch, 0.8*inch, 0.8*inch, 1.9*inch], styles)
+    else:
+        yield long_table(tests_data[0], partial(test_class_rows, test_classes, results, styles),
+                         [2*inch, 1.3*inch, 2.2*inch], styles)
+    yield Spacer(1, 12)
+    
+    if test_classes and results:
+        yield Paragraph("Rezultati testova:", styles['Heading3'])
+        yield Spacer(1, 6)
+        yield long_table(['Test', 'Status', 'Trajanje'],
+                         partial(test_result_rows, test_classes, results, styles),
+                         [3.5*inch, 1*inch, 1*inch], styles)
+        yield Spacer(1, 12)
+    
+    yield Paragraph("5.2. Primeri Testova", styles['Heading2'])
+    yield Spacer(1, 6)
+    
+    code_style = styles['CodeBlock']
     
     test_code = """
     [TestClass]
@@ -951,79 +1057,39 @@ def create_testing_section(story, styles):
         }
     }
     """
-    story.append(Paragraph(test_code, code_style))
-    story.append(Spacer(1, 12))
+    yield Paragraph(test_code, code_style)
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("5.3. Pokretanje Testova", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("5.3. Pokretanje Testova", styles['Heading2'])
+    yield Spacer(1, 6)
     
     test_run = """
     Testovi se mogu pokrenuti iz Visual Studio-a preko Test Explorer-a ili korišćenjem 
     komandne linije:
     """
-    story.append(Paragraph(test_run, styles['Normal']))
-    story.append(Spacer(1, 6))
+    yield Paragraph(test_run, styles['Normal'])
+    yield Spacer(1, 6)
     
     test_command = """
     dotnet test BudgetPlanner.Tests/BudgetPlanner.Tests.csproj
     """
-    story.append(Paragraph(test_command, code_style))
-    story.append(PageBreak())
+    yield Paragraph(test_command, code_style)
+    yield PageBreak()
 
-def create_git_section(story, styles):
-    """Create Git section"""
-    code_style = ParagraphStyle(
-        'Code',
-        parent=styles['Normal'],
-        fontName='Courier',
-        fontSize=8,
-        leftIndent=20,
-        textColor=colors.HexColor('#2c5aa0'),
-        backColor=colors.HexColor('#f5f5f5')
-    )
-    
-    story.append(Paragraph("6. Git i Verzionisanje", styles['Heading1']))
-    story.append(Spacer(1, 12))
-    
-    git_desc = """
-    Projekat koristi Git za verzionisanje koda i GitHub za hosting repozitorijuma. Implementirana 
-    je strategija grananja (branching) sa feature granama i povremenim merge-ovima u main granu.
-    """
-    story.append(Paragraph(git_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
-    
-    story.append(Paragraph("6.1. Struktura Repozitorijuma", styles['Heading2']))
-    story.append(Spacer(1, 6))
-    
-    repo_structure = """
-    BudgetPlanner/<br/>
-    ├── BudgetPlanner.App/          # Glavni WPF projekat<br/>
-    │   ├── Models/                 # Domenski modeli<br/>
-    │   ├── ViewModels/             # ViewModel klase<br/>
-    │   ├── Views/                  # XAML prikazi<br/>
-    │   ├── Services/               # Servisni sloj<br/>
-    │   ├── Data/                   # DbContext<br/>
-    │   ├── Commands/               # ICommand implementacije<br/>
-    │   └── Helpers/                # Helper klase<br/>
-    ├── BudgetPlanner.Tests/        # Test projekat<br/>
-    ├── Documentation/              # Dokumentacija<br/>
-    │   └── UML/                    # PlantUML dijagrami<br/>
-    ├── .gitignore                  # Git ignore fajl<br/>
-    ├── README.md                   # Projekat README<br/>
-    └── BudgetPlanner.sln           # Solution fajl
-    """
-    story.append(Paragraph(repo_structure, code_style))
-    story.append(Spacer(1, 12))
-    
-    story.append(Paragraph("6.2. Commit Istorija", styles['Heading2']))
-    story.append(Spacer(1, 6))
-    
+def commit_rows(commits, first_number, styles):
+    """Rows of the commit table, produced as commits arrive"""
+    for number, commit in enumerate(commits, first_number):
+        yield [str(number), commit.date, Paragraph(escape(commit.author), styles['TableCell']),
+               Paragraph(escape(commit.subject), styles['TableCell'])]
+
+def create_builtin_commit_list(styles):
+    """Commit overview used when the project is not a git repository"""
     commit_desc = """
     Projekat sadrži više od 15 commit-ova koji prate razvoj aplikacije od početne strukture 
     do finalne verzije. Commit-ovi su pravilno imenovani i opisani.
     """
-    story.append(Paragraph(commit_desc, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(commit_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
     commits = [
         "Initial project structure with MVVM folders",
@@ -1049,12 +1115,85 @@ def create_git_section(story, styles):
     ]
     
     for i, commit in enumerate(commits, 1):
-        story.append(Paragraph(f"{i}. {commit}", styles['Normal']))
+        yield Paragraph(f"{i}. {commit}", styles['Normal'])
+    
+    yield Spacer(1, 12)
+
+def history_filters(project):
+    """git log filters of the documented history: since, until and branch"""
+    return {key: project.history.get(key) for key in ('since', 'until', 'branch')}
+
+def create_git_section(styles, project):
+    """Create Git section"""
+    code_style = styles['CodeBlock']
     
-    story.append(Spacer(1, 12))
+    yield Paragraph("6. Git i Verzionisanje", styles['Heading1'])
+    yield Spacer(1, 12)
+    
+    git_desc = """
+    Projekat koristi Git za verzionisanje koda i GitHub za hosting repozitorijuma. Implementirana 
+    je strategija grananja (branching) sa feature granama i povremenim merge-ovima u main granu.
+    """
+    yield Paragraph(git_desc, styles['Normal'])
+    yield Spacer(1, 12)
     
-    story.append(Paragraph("6.3. Grane", styles['Heading2']))
-    story.append(Spacer(1, 6))
+    yield Paragraph("6.1. Struktura Repozitorijuma", styles['Heading2'])
+    yield Spacer(1, 6)
+    
+    repo_structure = """
+    BudgetPlanner/<br/>
+    ├── BudgetPlanner.App/          # Glavni WPF projekat<br/>
+    │   ├── Models/                 # Domenski modeli<br/>
+    │   ├── ViewModels/             # ViewModel klase<br/>
+    │   ├── Views/                  # XAML prikazi<br/>
+    │   ├── Services/               # Servisni sloj<br/>
+    │   ├── Data/                   # DbContext<br/>
+    │   ├── Commands/               # ICommand implementacije<br/>
+    │   └── Helpers/                # Helper klase<br/>
+    ├── BudgetPlanner.Tests/        # Test projekat<br/>
+    ├── Documentation/              # Dokumentacija<br/>
+    │   └── UML/                    # PlantUML dijagrami<br/>
+    ├── .gitignore                  # Git ignore fajl<br/>
+    ├── README.md                   # Projekat README<br/>
+    └── BudgetPlanner.sln           # Solution fajl
+    """
+    yield Paragraph(repo_structure, code_style)
+    yield Spacer(1, 12)
+    
+    yield Paragraph("6.2. Commit Istorija", styles['Heading2'])
+    yield Spacer(1, 6)
+    
+    history = project.history
+    filters = history_filters(project)
+    try:
+        total = count_commits(project.root, **filters)
+    except GitError as e:
+        print(f"  No git history for {project.root} ({e}), using the built-in commit list")
+        total = None
+    
+    if total is not None:
+        shown = min(total, history.get('max_count') or total)
+        commit_desc = f"""
+        Projekat sadrži {total} commit-ova koji prate razvoj aplikacije od početne strukture 
+        do finalne verzije. Commit-ovi su pravilno imenovani i opisani.
+        """
+        if shown < total:
+            commit_desc += f" Prikazano je poslednjih {shown}, od najstarijeg ka najnovijem."
+        yield Paragraph(commit_desc, styles['Normal'])
+        yield Spacer(1, 12)
+    
+        # git log runs again for each layout pass, the rows are never all in memory
+        def rows():
+            commits = iter_commits(project.root, max_count=shown, reverse=True, **filters)
+            return commit_rows(commits, total - shown + 1, styles)
+        yield long_table(['#', 'Datum', 'Autor', 'Poruka'], rows,
+                         [0.5*inch, 0.9*inch, 1.2*inch, 2.9*inch], styles)
+        yield Spacer(1, 12)
+    else:
+        yield from create_builtin_commit_list(styles)
+    
+    yield Paragraph("6.3. Grane", styles['Heading2'])
+    yield Spacer(1, 6)
     
     branches = """
     • <b>main</b> - Glavna grana sa stabilnim kodom<br/>
@@ -1063,21 +1202,29 @@ def create_git_section(story, styles):
     • <b>feature/serialization</b> - JSON i XML serijalizacija<br/>
     • <b>feature/testing</b> - Dodavanje jediničnih testova
     """
-    story.append(Paragraph(branches, styles['Normal']))
-    story.append(PageBreak())
+    yield Paragraph(branches, styles['Normal'])
+    yield PageBreak()
 
-def create_conclusion(story, styles):
+def create_conclusion(styles, project):
     """Create conclusion section"""
-    story.append(Paragraph("7. Zaključak", styles['Heading1']))
-    story.append(Spacer(1, 12))
+    yield Paragraph("7. Zaključak", styles['Heading1'])
+    yield Spacer(1, 12)
+    
+    _, db_sets = scan_models(project)
+    tests = count_tests(scan_test_classes(project))
+    try:
+        commits = f"{count_commits(project.root, **history_filters(project))} commit-ova"
+    except GitError:
+        # The git section already reported the missing history
+        commits = "Preko 15 commit-ova"
     
     conclusion_text = """
     Projekat <b>Lični Planer Budžeta</b> uspešno demonstrira primenu MVVM arhitekture u WPF aplikacijama 
     sa integracijom Entity Framework Core ORM-a. Kroz implementaciju aplikacije ostvareni su svi 
     postavljeni zahtevi projekta:
     """
-    story.append(Paragraph(conclusion_text, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(conclusion_text, styles['Normal'])
+    yield Spacer(1, 12)
     
     achievements = [
         "<b>Funkcionalni zahtevi:</b> Implementirano 8 glavnih use case-ova sa CRUD operacijama, " +
@@ -1085,7 +1232,7 @@ def create_conclusion(story, styles):
         
         "<b>MVVM arhitektura:</b> Striktna primena MVVM obrasca sa jasnom separacijom Model-View-ViewModel slojeva",
         
-        "<b>Entity Framework Core:</b> Konfiguracija DbContext-a sa 5 entiteta, relacijama, migracijama i " +
+        f"<b>Entity Framework Core:</b> Konfiguracija DbContext-a sa {len(db_sets) or 5} entiteta, relacijama, migracijama i " +
         "Table-Per-Hierarchy strategijom nasleđivanja",
         
         "<b>Dizajn šabloni:</b> Implementacija Singleton (UserSession), Factory (TransactionFactory) i " +
@@ -1095,17 +1242,17 @@ def create_conclusion(story, styles):
         
         "<b>PDF izveštaji:</b> Generisanje profesionalnih mesečnih izveštaja sa tabelama i statistikom",
         
-        "<b>Testiranje:</b> 8 jediničnih testova koji pokrivaju ViewModel logiku i dizajn šablone",
+        f"<b>Testiranje:</b> {tests or 8} jediničnih testova koji pokrivaju ViewModel logiku i dizajn šablone",
         
         "<b>UML modelovanje:</b> Kompletna dokumentacija sa Use Case, Class, Package i Sequence dijagramima",
         
-        "<b>Git verzionisanje:</b> Preko 15 commit-ova sa feature granama i pravilnim commit porukama"
+        f"<b>Git verzionisanje:</b> {commits} sa feature granama i pravilnim commit porukama"
     ]
     
     for achievement in achievements:
-        story.append(Paragraph(f"• {achievement}", styles['Normal']))
+        yield Paragraph(f"• {achievement}", styles['Normal'])
     
-    story.append(Spacer(1, 12))
+    yield Spacer(1, 12)
     
     future_work = """
     <b>Moguća proširenja aplikacije:</b><br/>
@@ -1116,70 +1263,458 @@ def create_conclusion(story, styles):
     • Mobilna aplikacija za praćenje rashoda u pokretu<br/>
     • Machine learning predikcije budućih troškova
     """
-    story.append(Paragraph(future_work, styles['Normal']))
-    story.append(Spacer(1, 12))
+    yield Paragraph(future_work, styles['Normal'])
+    yield Spacer(1, 12)
     
     final_note = """
     Aplikacija je u potpunosti funkcionalna, testirana i pripremljena za deployment. Izvorni kod je 
     organizovan, dokumentovan i dostupan na GitHub-u. Sva dokumentacija, uključujući UML dijagrame 
     i ovu PDF dokumentaciju, pruža kompletnu sliku arhitekture i implementacije projekta.
     """
-    story.append(Paragraph(final_note, styles['Normal']))
+    yield Paragraph(final_note, styles['Normal'])
 
-def generate_documentation():
-    """Main function to generate PDF documentation"""
-    output_path = "/home/claude/BudgetPlanner/Documentation/Projektna_Dokumentacija.pdf"
-    
-    # Create document
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=72
-    )
-    
-    # Container for the 'Flowable' objects
+# Ordered registry of document sections: name -> (progress message, producer).
+# Producers are generators, so a section's flowables are only built when it is selected.
+SECTIONS = {
+    "title": ("Generating title page...", create_title_page),
+    "toc": ("Generating table of contents...", create_toc),
+    "introduction": ("Generating introduction...", create_introduction),
+    "analysis": ("Generating analysis section...", create_analysis_section),
+    "modeling": ("Generating modeling section...", create_modeling_section),
+    "implementation": ("Generating implementation section...", create_implementation_section),
+    "testing": ("Generating testing section...", create_testing_section),
+    "git": ("Generating Git section...", create_git_section),
+    "conclusion": ("Generating conclusion...", create_conclusion),
+}
+
+DEFAULT_PROJECT_ROOT = "/home/claude/BudgetPlanner"
+OUTPUT_NAME = os.path.join("Documentation", "Projektna_Dokumentacija.pdf")
+SOURCE_DIR_NAME = "BudgetPlanner.App"
+TEST_DIR_NAME = "BudgetPlanner.Tests"
+# Newest commits listed in the Git section; 0 lists the whole history
+DEFAULT_MAX_COMMITS = 100
+# Box diagrams are scaled into: the frame width, and most of its height so
+# a heading and the caption still fit on the page
+DIAGRAM_MAX_WIDTH = A4[0] - 2 * 72 - 12
+DIAGRAM_MAX_HEIGHT = (A4[1] - 2 * 72 - 12) * 0.75
+# Where diagram images are looked for: generate_diagrams.py's output first, so
+# fresh renders win over images committed next to the .puml sources
+DIAGRAM_DIRS = (os.path.join("Documentation", "Images"), os.path.join("Documentation", "UML"))
+DEFAULT_OUTPUT_PATH = os.path.join(DEFAULT_PROJECT_ROOT, OUTPUT_NAME)
+
+PAGE_LAYOUT = dict(
+    pagesize=A4,
+    rightMargin=72,
+    leftMargin=72,
+    topMargin=72,
+    bottomMargin=72
+)
+
+class Project:
+    """Repository being documented, handed to every section producer"""
+    
+    def __init__(self, root=DEFAULT_PROJECT_ROOT, output_path=None,
+                 title="LIČNI PLANER BUDŽETA",
+                 subtitle="WPF MVVM Aplikacija sa Entity Framework Core", source_dir=None,
+                 history=None, test_dir=None, test_results=None, diagram_dirs=DIAGRAM_DIRS,
+                 image_dpi=DEFAULT_DPI, vector_diagrams=True):
+        self.root = os.path.abspath(root)
+        self.output_path = output_path or os.path.join(self.root, OUTPUT_NAME)
+        # Application project scanned for the class and entity tables
+        self.source_dir = os.path.join(self.root, source_dir or SOURCE_DIR_NAME)
+        # git log filters for the commit table: since, until, branch, max_count
+        self.history = {'max_count': DEFAULT_MAX_COMMITS, **(history or {})}
+        # MSTest project to inventory, and an optional TRX or JUnit results file
+        self.test_dir = os.path.join(self.root, test_dir or TEST_DIR_NAME)
+        self.test_results = test_results
+        # Where rendered diagrams are looked up, and the resolution they are printed at
+        self.diagram_dirs = [os.path.join(self.root, directory) for directory in diagram_dirs]
+        self.image_dpi = image_dpi
+        # Prefer <name>.svg over the PNG when svglib is installed
+        self.vector_diagrams = vector_diagrams
+        self.title = title
+        self.subtitle = subtitle
+    
+    @property
+    def name(self):
+        """Short name for progress and summary output"""
+        return os.path.basename(self.root)
+    
+    @classmethod
+    def load(cls, path):
+        """Project from a repository root, or from a JSON file describing one
+        
+        Relative "root" and "output" entries in the file are resolved against
+        its directory, e.g. {"root": "..", "title": "KUĆNI BUDŽET"}.
+        """
+        if not path.endswith('.json'):
+            return cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        root = os.path.join(base, config.pop('root', '.'))
+        output = config.pop('output', None)
+        if config.get('test_results'):
+            config['test_results'] = os.path.join(base, config['test_results'])
+        return cls(root, output and os.path.join(base, output), **config)
+
+def build_story(styles, project, sections=None, profiler=None):
+    """Collect the flowables of the selected sections, in document order"""
     story = []
+    for name, (message, producer) in SECTIONS.items():
+        if sections is not None and name not in sections:
+            continue
+        print(message)
+        if profiler is None:
+            story.extend(producer(styles, project))
+            continue
+        with profiler.section(name):
+            flowables = list(producer(styles, project))
+            profiler.count(flowables)
+        story.extend(flowables)
+    return story
+
+def toc_cache_path(output_path):
+    """Where the TOC entries of the previous build of output_path are kept"""
+    digest = hashlib.sha256(os.path.abspath(output_path).encode('utf-8')).hexdigest()
+    # Kept in the cache directory rather than next to the output, inside the project tree
+    return cache_location("toc", f"{digest}.json")
+
+def load_toc_cache(path):
+    """TOC entries recorded by the previous build, or an empty list"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [tuple(entry) for entry in json.load(f)]
+    except (FileNotFoundError, ValueError, TypeError):
+        return []
+
+def save_toc_cache(path, entries):
+    """Record TOC entries for the next build"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([list(entry) for entry in entries], f, ensure_ascii=False, indent=1)
+
+def prepare_output(project):
+    """Output path of the project, with its directory created"""
+    output_path = project.output_path
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    return output_path
+
+def generate_documentation(project=None, sections=None, theme_path=None, profiler=None):
+    """Main function to generate PDF documentation
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    
-    # Build document sections
-    print("Generating title page...")
-    create_title_page(story, styles)
-    
-    print("Generating table of contents...")
-    create_toc(story, styles)
+    A BuildProfiler, when given, records the cost of each section producer
+    and of the layout.
+    """
+    project = project or Project()
+    output_path = prepare_output(project)
     
-    print("Generating introduction...")
-    create_introduction(story, styles)
+    # Create document
+    doc = DocumentTemplate(output_path, **PAGE_LAYOUT)
     
-    print("Generating analysis section...")
-    create_analysis_section(story, styles)
+    # Shared paragraph and table styles, built once per process
+    styles = load_theme(theme_path)
     
-    print("Generating modeling section...")
-    create_modeling_section(story, styles)
+    # Build document sections
+    story = build_story(styles, project, sections, profiler)
     
-    print("Generating implementation section...")
-    create_implementation_section(story, styles)
+    # Seed the TOC with the previous build's headings; when they still match
+    # the layout, multiBuild is satisfied after a single pass
+    tocs = [flowable for flowable in story if isinstance(flowable, TableOfContents)]
+    cache_path = toc_cache_path(output_path)
+    cached_entries = load_toc_cache(cache_path) if tocs else []
+    for toc in tocs:
+        toc.addEntries(cached_entries)
     
-    print("Generating testing section...")
-    create_testing_section(story, styles)
+    # Build PDF
+    print("Building PDF document...")
+    if profiler is None:
+        passes = doc.multiBuild(story)
+    else:
+        with profiler.layout():
+            passes = doc.multiBuild(story)
+    print(f"Laid out in {passes} pass{'es' if passes > 1 else ''}")
     
-    print("Generating Git section...")
-    create_git_section(story, styles)
+    if tocs and tocs[0]._entries != cached_entries:
+        save_toc_cache(cache_path, tocs[0]._entries)
     
-    print("Generating conclusion...")
-    create_conclusion(story, styles)
+    print(f"✓ Documentation generated successfully: {output_path}")
+    return output_path
+
+def layout_section(name, path, project, theme_path=None, cache_dir=None):
+    """Lay out one section into its own PDF, return (page count, headings, PDF path)
     
-    # Build PDF
-    print("Building PDF document...")
+    With a cache_dir, a section whose flowables match an earlier layout is not
+    laid out again and the cached PDF is returned instead.
+    """
+    message, producer = SECTIONS[name]
+    print(message)
+    story = list(producer(load_theme(theme_path), project))
+    if cache_dir:
+        cache = SectionCache(cache_dir)
+        key = fingerprint(story, name, PAGE_LAYOUT)
+        cached = cache.get(name, key)
+        if cached:
+            print(f"  {name} is unchanged, reusing its layout")
+            return cached
+    doc = DocumentTemplate(path, key_prefix=f"{name}-", **PAGE_LAYOUT)
     doc.build(story)
+    if cache_dir:
+        return cache.put(name, key, path, doc.page, doc.headings)
+    return doc.page, doc.headings, path
+
+def layout_toc(path, entries, project, theme_path=None):
+    """Lay out the table of contents from already known entries, return its page count"""
+    story = list(create_toc(load_theme(theme_path), project))
+    for flowable in story:
+        if isinstance(flowable, TableOfContents):
+            flowable.addEntries(entries)
+            flowable.beforeBuild()
+    
+    # The headings are in other parts; give each link a stand-in destination
+    # whose 'top' is the entry index, link_toc_entries retargets it after the merge
+    def add_destinations(canvas, doc):
+        for index, (_, _, _, key) in enumerate(entries):
+            canvas.bookmarkPage(key, fit="XYZ", left=0, top=index, zoom=0)
+    
+    doc = DocumentTemplate(path, **PAGE_LAYOUT)
+    doc.build(story, onFirstPage=add_destinations)
+    return doc.page
+
+def link_toc_entries(writer, toc_pages, entries):
+    """Point the stand-in TOC link destinations at the merged heading pages"""
+    for page in toc_pages:
+        for annotation in page.get('/Annots', []):
+            annotation = annotation.get_object()
+            destination = annotation.get('/Dest')
+            if destination is None or destination[1] != '/XYZ':
+                continue
+            target = writer.pages[entries[int(destination[3])][2] - 1]
+            annotation[NameObject('/Dest')] = ArrayObject(
+                [target.indirect_reference, NameObject('/Fit')])
+
+def generate_documentation_parallel(project=None, sections=None, theme_path=None, jobs=None,
+                                    cache_dir=None):
+    """Lay out each section on its own and merge the parts in document order
     
-    print(f"✓ Documentation generated successfully: {output_path}")
+    Sections are laid out in a process pool unless jobs is 1. With a cache_dir
+    only sections that changed since an earlier build are laid out again.
+    """
+    project = project or Project()
+    output_path = prepare_output(project)
+    names = [name for name in SECTIONS if sections is None or name in sections]
+    
+    with tempfile.TemporaryDirectory(prefix="documentation-") as parts_dir:
+        parts = {name: os.path.join(parts_dir, f"{index:02d}-{name}.pdf")
+                 for index, name in enumerate(names)}
+        
+        # Every section starts on a new page, so parts can be laid out independently
+        body = [name for name in names if name != 'toc']
+        if jobs == 1:
+            layouts = {name: layout_section(name, parts[name], project, theme_path, cache_dir)
+                       for name in body}
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {name: executor.submit(layout_section, name, parts[name], project,
+                                                 theme_path, cache_dir)
+                           for name in body}
+                layouts = {name: future.result() for name, future in futures.items()}
+        
+        # The TOC length shifts every page after it, so repeat until its page count settles
+        toc_pages = 1 if 'toc' in names else 0
+        while True:
+            offsets, page = {}, 0
+            for name in names:
+                offsets[name] = page
+                page += toc_pages if name == 'toc' else layouts[name][0]
+            entries = [(level, text, offsets[name] + local_page, key)
+                       for name, (_, headings, _) in layouts.items()
+                       for level, text, local_page, key in headings]
+            if 'toc' not in names:
+                break
+            print("Generating table of contents...")
+            pages = layout_toc(parts['toc'], entries, project, theme_path)
+            if pages == toc_pages:
+                break
+            toc_pages = pages
+        
+        # Outlines and the bookmarks the TOC links to are carried over by append
+        print(f"Merging {len(names)} sections...")
+        writer = PdfWriter()
+        for name in names:
+            writer.append(parts['toc'] if name == 'toc' else layouts[name][2])
+        if 'toc' in names:
+            first = offsets['toc']
+            link_toc_entries(writer, writer.pages[first:first + toc_pages], entries)
+        writer.page_mode = "/UseOutlines"
+        with open(output_path, 'wb') as f:
+            writer.write(f)
+    
+    if cache_dir:
+        SectionCache(cache_dir).prune()
+    print(f"✓ Documentation generated successfully: {output_path} ({page} pages)")
     return output_path
 
+def build_project(project, sections=None, theme_path=None, cache_dir=None):
+    """Batch job: document one project, return (seconds, error)"""
+    start = time.perf_counter()
+    try:
+        if cache_dir:
+            generate_documentation_parallel(project, sections, theme_path, 1, cache_dir)
+        else:
+            generate_documentation(project, sections, theme_path)
+    except Exception as e:
+        return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, None
+
+def generate_batch(projects, sections=None, theme_path=None, jobs=1, cache_dir=None):
+    """Document many projects from one process, or from a pool of worker processes
+    
+    The theme and reportlab's font and image caches are per process, so each
+    worker loads them once and reuses them for every project it is handed.
+    """
+    start = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(build_project, projects, [sections] * len(projects),
+                                        [theme_path] * len(projects), [cache_dir] * len(projects)))
+    else:
+        results = [build_project(project, sections, theme_path, cache_dir) for project in projects]
+    elapsed = time.perf_counter() - start
+    
+    width = max(len("project"), *(len(project.name) for project in projects))
+    print(f"\n{'project':<{width}}  {'time':>7}  result")
+    for project, (seconds, error) in zip(projects, results):
+        if error:
+            result = f"FAILED {error}"
+        else:
+            result = f"{os.path.getsize(project.output_path) // 1024} KB {project.output_path}"
+        print(f"{project.name:<{width}}  {seconds:>6.2f}s  {result}")
+    failed = sum(1 for _, error in results if error)
+    total = sum(seconds for seconds, _ in results)
+    print(f"{len(projects) - failed}/{len(projects)} projects documented in {elapsed:.2f}s "
+          f"({total:.2f}s of job time)")
+    return failed
+
+def parse_sections(value):
+    """argparse type for a comma separated list of section names"""
+    sections = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in SECTIONS]
+    if unknown or not sections:
+        raise argparse.ArgumentTypeError(
+            f"unknown section(s) {', '.join(unknown) or value!r}, choose from {', '.join(SECTIONS)}")
+    return set(sections)
+
+def parse_project(value):
+    """argparse type for a project root or JSON project file"""
+    try:
+        return Project.load(value)
+    except (OSError, ValueError, TypeError) as e:
+        raise argparse.ArgumentTypeError(f"cannot load project {value!r}: {e}")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate the project documentation PDF")
+    parser.add_argument("projects", nargs="*", type=parse_project, metavar="PROJECT",
+                        help="project roots or JSON project files; more than one runs a batch "
+                             f"with one PDF per project under <root>/{OUTPUT_NAME} "
+                             f"(default: {DEFAULT_PROJECT_ROOT})")
+    parser.add_argument("-o", "--output",
+                        help=f"path of the generated PDF (default: {DEFAULT_OUTPUT_PATH})")
+    parser.add_argument("--sections", type=parse_sections,
+                        help="comma separated sections to build for a quick preview, "
+                             f"e.g. implementation,testing (all of: {', '.join(SECTIONS)})")
+    parser.add_argument("--theme", metavar="JSON",
+                        help="theme file overriding the default palette and fonts, "
+                             'e.g. {"palette": {"primary": "#7a003c"}}')
+    history_group = parser.add_argument_group("commit history")
+    history_group.add_argument("--since", metavar="DATE",
+                               help="list commits after this date, in any form git log accepts")
+    history_group.add_argument("--until", metavar="DATE", help="list commits before this date")
+    history_group.add_argument("--branch", help="branch or revision to list (default: HEAD)")
+    history_group.add_argument("--max-commits", type=int, dest="max_count", metavar="N",
+                               help=f"newest commits to list, 0 for all (default: {DEFAULT_MAX_COMMITS})")
+    parser.add_argument("--image-dpi", type=int, metavar="DPI",
+                        help=f"resolution diagrams are resampled to (default: {DEFAULT_DPI})")
+    parser.add_argument("--raster-diagrams", action="store_true",
+                        help="embed PNG diagrams even where an SVG is available")
+    parser.add_argument("--test-results", metavar="FILE",
+                        help="TRX or JUnit XML results to report pass/fail and durations from")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="lay out sections in this many processes and merge the parts "
+                             "(requires pypdf), or for a batch, document this many projects "
+                             "at once (default: 1, a single in-process build)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="lay out only the sections that changed since an earlier build "
+                             "and reuse the cached layout of the others (requires pypdf)")
+    section_cache_dir = SectionCache().cache_dir
+    parser.add_argument("--section-cache", default=section_cache_dir, metavar="DIR",
+                        help=f"where --incremental keeps laid out sections (default: {section_cache_dir})")
+    profile_group = parser.add_argument_group("profiling")
+    profile_group.add_argument("--profile", action="store_true",
+                               help="report wall time, CPU time and peak memory per section, and "
+                                    "layout time per flowable type")
+    profile_group.add_argument("--profile-json", metavar="FILE",
+                               help="also write the --profile report to FILE as JSON")
+    profile_group.add_argument("--cprofile", metavar="FILE",
+                               help="run under cProfile and write the stats to FILE "
+                                    "(python -m pstats FILE)")
+    args = parser.parse_args(argv)
+    if not args.projects:
+        args.projects = [Project()]
+    for project in args.projects:
+        if args.image_dpi:
+            project.image_dpi = args.image_dpi
+        if args.raster_diagrams:
+            project.vector_diagrams = False
+        project.history.update({key: getattr(args, key) for key in ('since', 'until', 'branch', 'max_count')
+                                if getattr(args, key) is not None})
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.output:
+        if len(args.projects) > 1:
+            parser.error("--output needs a single project")
+        args.projects[0].output_path = args.output
+    if args.test_results:
+        if len(args.projects) > 1:
+            parser.error("--test-results needs a single project, use \"test_results\" in project files")
+        args.projects[0].test_results = args.test_results
+    if args.jobs > 1 and len(args.projects) == 1 and PdfWriter is None:
+        parser.error("--jobs needs pypdf to merge the sections (pip install pypdf)")
+    if args.incremental and PdfWriter is None:
+        parser.error("--incremental needs pypdf to merge the sections (pip install pypdf)")
+    if args.profile_json:
+        args.profile = True
+    if args.profile and (len(args.projects) > 1 or args.jobs > 1 or args.incremental):
+        parser.error("--profile times a single in-process build, drop -j, --incremental "
+                     "and extra projects")
+    # Only the cache directory is passed on, None turns caching off
+    args.cache_dir = args.section_cache if args.incremental else None
+    return args
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    if args.cprofile:
+        return profile_call(args.cprofile, run, args)
+    return run(args)
+
+def run(args):
+    """Build what the parsed command line asks for, return the exit code"""
+    if len(args.projects) > 1:
+        return 1 if generate_batch(args.projects, args.sections, args.theme, args.jobs,
+                                   args.cache_dir) else 0
+    if args.jobs > 1 or args.cache_dir:
+        generate_documentation_parallel(args.projects[0], args.sections, args.theme, args.jobs,
+                                        args.cache_dir)
+    else:
+        profiler = BuildProfiler() if args.profile else None
+        generate_documentation(args.projects[0], args.sections, args.theme, profiler)
+        if profiler:
+            profiler.report()
+            if args.profile_json:
+                profiler.write_json(args.profile_json)
+    return 0
+
 if __name__ == "__main__":
-    generate_documentation()
+    sys.exit(main())
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic Budget Planner solution for scale testing: C#
+sources and tests, PlantUML diagrams and a long git history, all
+deterministic for a given seed
+"""
+
+import argparse
+import io
+import os
+import random
+import subprocess
+import sys
+from collections import namedtuple
+from xml.sax.saxutils import quoteattr
+
+# Same layout as the real solution, so the generators find everything by default
+SOURCE_DIR_NAME = "BudgetPlanner.App"
+TEST_DIR_NAME = "BudgetPlanner.Tests"
+UML_DIR = os.path.join("Documentation", "UML")
+RESULTS_PATH = os.path.join("TestResults", "results.xml")
+DIAGRAM_KINDS = ("class", "sequence", "usecase")
+# 2023-01-01T00:00:00Z, history dates count on from here
+HISTORY_START = 1672531200
+
+FixtureSizes = namedtuple("FixtureSizes", "models view_models services test_classes tests_per_class "
+                                          "diagrams diagram_size commits authors")
+DEFAULT_SIZES = FixtureSizes(models=300, view_models=40, services=40, test_classes=60,
+                             tests_per_class=8, diagrams=40, diagram_size=30, commits=3000, authors=8)
+
+_WORDS = ("Account", "Budget", "Category", "Expense", "Income", "Invoice", "Ledger", "Payment",
+          "Report", "Saving", "Schedule", "Tag", "Transfer", "User", "Wallet", "Goal")
+_PROPERTY_TYPES = ("int", "string", "decimal", "DateTime", "bool", "double", "Guid")
+_VERBS = ("Add", "Fix", "Refactor", "Update", "Remove", "Rename", "Document", "Test")
+_FIRST_NAMES = ("Ana", "Marko", "Jelena", "Nikola", "Milica", "Stefan", "Ivana", "Luka", "Sara",
+                "Petar", "Mina", "Vuk")
+_LAST_NAMES = ("Jovanović", "Petrović", "Nikolić", "Marković", "Đorđević", "Stojanović", "Ilić",
+               "Pavlović")
+
+def type_names(rng, count, suffix=""):
+    """`count` distinct PascalCase names built from domain words"""
+    names, seen = [], set()
+    while len(names) < count:
+        name = rng.choice(_WORDS) + rng.choice(_WORDS) + suffix
+        if name in seen:
+            name = f"{name}{len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+def model_source(name, base, properties, abstract=False):
+    """C# entity with a summary, properties and an optional base class"""
+    lines = ["using System;", "", "namespace BudgetPlanner.App.Models", "{",
+             "    /// <summary>", f"    /// {name} entity of the synthetic budget domain.",
+             "    /// </summary>",
+             f"    public {'abstract ' if abstract else ''}class {name}{f' : {base}' if base else ''}",
+             "    {"]
+    if not base:
+        lines.append("        public int Id { get; set; }")
+    for prop_type, prop_name in properties:
+        lines.append(f"        public {prop_type} {prop_name} {{ get; set; }}")
+    lines += ["    }", "}"]
+    return "\n".join(lines) + "\n"
+
+def source_files(root, rng, sizes):
+    """Models, view models, services and the DbContext; return {path: text}"""
+    files = {}
+    source_dir = os.path.join(root, SOURCE_DIR_NAME)
+    models = type_names(rng, sizes.models)
+    # A few abstract bases, each with a handful of subclasses, like Category and Transaction
+    bases = set(rng.sample(models, max(1, sizes.models // 20))) if models else set()
+    concrete = []
+    for name in models:
+        base = None
+        if name not in bases and rng.random() < 0.3:
+            base = rng.choice(sorted(bases))
+        properties = [(rng.choice(_PROPERTY_TYPES), f"{rng.choice(_WORDS)}{index}")
+                      for index in range(rng.randint(2, 8))]
+        if models and rng.random() < 0.3:
+            properties.append((f"virtual {rng.choice(models)}", f"Related{len(properties)}"))
+        files[os.path.join(source_dir, "Models", f"{name}.cs")] = model_source(
+            name, base, properties, abstract=name in bases)
+        if name not in bases:
+            concrete.append(name)
+    
+    db_sets = "".join(f"        public DbSet<{name}> {name}Set {{ get; set; }} = null!;\n"
+                      for name in concrete)
+    files[os.path.join(source_dir, "Data", "BudgetDbContext.cs")] = (
+        "using Microsoft.EntityFrameworkCore;\nusing BudgetPlanner.App.Models;\n\n"
+        "namespace BudgetPlanner.App.Data\n{\n"
+        "    public class BudgetDbContext : DbContext\n    {\n"
+        f"{db_sets}    }}\n}}\n")
+    
+    files[os.path.join(source_dir, "ViewModels", "ViewModelBase.cs")] = (
+        "namespace BudgetPlanner.App.ViewModels\n{\n"
+        "    /// <summary>\n    /// Base class raising property change notifications.\n    /// </summary>\n"
+        "    public abstract class ViewModelBase : INotifyPropertyChanged\n    {\n"
+        "        public event PropertyChangedEventHandler? PropertyChanged;\n    }\n}\n")
+    for name in type_names(rng, sizes.view_models, "ViewModel"):
+        properties = "".join(f"        public {rng.choice(_PROPERTY_TYPES)} {rng.choice(_WORDS)}{index} "
+                             "{ get; set; }\n" for index in range(rng.randint(2, 6)))
+        files[os.path.join(source_dir, "ViewModels", f"{name}.cs")] = (
+            "namespace BudgetPlanner.App.ViewModels\n{\n"
+            f"    /// <summary>\n    /// Screen logic for {name[:-len('ViewModel')]}.\n    /// </summary>\n"
+            f"    public class {name} : ViewModelBase\n    {{\n{properties}    }}\n}}\n")
+    for name in type_names(rng, sizes.services, "Service"):
+        files[os.path.join(source_dir, "Services", f"{name}.cs")] = (
+            "namespace BudgetPlanner.App.Services\n{\n"
+            f"    /// <summary>\n    /// Operations on {name[:-len('Service')]} data.\n    /// </summary>\n"
+            f"    public class {name} : I{name}\n    {{\n"
+            "        public bool IsReady { get; set; }\n    }\n}\n")
+    return files
+
+def test_files(root, rng, sizes):
+    """MSTest classes, some data driven; return ({path: text}, [(class, method)])"""
+    files, tests = {}, []
+    for name in type_names(rng, sizes.test_classes, "Tests"):
+        methods = []
+        for index in range(sizes.tests_per_class):
+            method = f"{rng.choice(_VERBS)}_{rng.choice(_WORDS)}_Case{index}"
+            tests.append((name, method))
+            if rng.random() < 0.2:
+                rows = "".join(f"        [DataRow({value})]\n" for value in rng.sample(range(100), 3))
+                methods.append(f"        [DataTestMethod]\n{rows}"
+                               f"        public void {method}(int value)\n        {{\n"
+                               "            Assert.IsTrue(value >= 0);\n        }\n")
+            else:
+                methods.append(f"        [TestMethod]\n        public void {method}()\n        {{\n"
+                               "            Assert.IsTrue(true);\n        }\n")
+        files[os.path.join(root, TEST_DIR_NAME, f"{name}.cs")] = (
+            "using Microsoft.VisualStudio.TestTools.UnitTesting;\n\n"
+            "namespace BudgetPlanner.Tests\n{\n"
+            f"    /// <summary>\n    /// Tests of {name[:-len('Tests')]}.\n    /// </summary>\n"
+            f"    [TestClass]\n    public class {name}\n    {{\n"
+            + "\n".join(methods) + "    }\n}\n")
+    return files, tests
+
+def junit_results(rng, tests):
+    """JUnit XML with a mostly passing outcome for every test"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', "<testsuites>",
+             f'  <testsuite name="BudgetPlanner.Tests" tests="{len(tests)}">']
+    for class_name, method in tests:
+        attributes = (f"classname={quoteattr('BudgetPlanner.Tests.' + class_name)} "
+                      f"name={quoteattr(method)} time=\"{rng.uniform(0.001, 0.5):.3f}\"")
+        roll = rng.random()
+        if roll < 0.03:
+            lines.append(f'    <testcase {attributes}><failure message="Assert.IsTrue failed"/></testcase>')
+        elif roll < 0.06:
+            lines.append(f"    <testcase {attributes}><skipped/></testcase>")
+        else:
+            lines.append(f"    <testcase {attributes}/>")
+    lines += ["  </testsuite>", "</testsuites>"]
+    return "\n".join(lines) + "\n"
+
+def class_diagram(rng, classes):
+    """PlantUML class diagram of `classes` classes with inheritance and associations"""
+    names = type_names(rng, classes)
+    lines = ["@startuml", "skinparam classAttributeIconSize 0"]
+    for name in names:
+        lines.append(f"class {name} {{")
+        for index in range(rng.randint(1, 5)):
+            lines.append(f"  -{rng.choice(_WORDS).lower()}{index} : {rng.choice(_PROPERTY_TYPES)}")
+        lines += [f"  +{rng.choice(_VERBS)}() : void", "}"]
+    for index, name in enumerate(names[1:], 1):
+        other = names[rng.randrange(index)]
+        lines.append(f"{other} <|-- {name}" if rng.random() < 0.4 else f"{name} --> \"*\" {other}")
+    lines.append("@enduml")
+    return "\n".join(lines) + "\n"
+
+def sequence_diagram(rng, messages):
+    """PlantUML sequence diagram with `messages` calls between a few participants"""
+    participants = type_names(rng, max(2, min(8, messages // 4 + 2)))
+    lines = ["@startuml", "actor Korisnik"] + [f"participant {name}" for name in participants]
+    previous = "Korisnik"
+    for index in range(messages):
+        target = rng.choice(participants)
+        lines.append(f"{previous} -> {target}: {rng.choice(_VERBS)}{rng.choice(_WORDS)}({index})")
+        if rng.random() < 0.5:
+            lines.append(f"{target} --> {previous}: rezultat")
+        previous = target
+    lines.append("@enduml")
+    return "\n".join(lines) + "\n"
+
+def usecase_diagram(rng, cases):
+    """PlantUML use case diagram with `cases` use cases shared among a few actors"""
+    actors = [f"{rng.choice(_FIRST_NAMES)}{index}" for index in range(max(1, cases // 8))]
+    lines = ["@startuml", "left to right direction"] + [f"actor {actor}" for actor in actors]
+    lines.append('rectangle "Budget Planner" {')
+    for index in range(cases):
+        lines.append(f'  usecase "{rng.choice(_VERBS)} {rng.choice(_WORDS).lower()} {index}" as UC{index}')
+    lines.append("}")
+    for index in range(cases):
+        lines.append(f"{rng.choice(actors)} --> UC{index}")
+    lines.append("@enduml")
+    return "\n".join(lines) + "\n"
+
+DIAGRAMS = {"class": class_diagram, "sequence": sequence_diagram, "usecase": usecase_diagram}
+
+def synthetic_diagram(kind, size, seed=0):
+    """One diagram of `kind` with `size` classes, messages or use cases"""
+    return DIAGRAMS[kind](random.Random(f"{seed}-{kind}-{size}"), size)
+
+def diagram_files(root, rng, sizes):
+    """.puml files cycling through the diagram kinds, sizes varying around diagram_size; return {path: text}"""
+    files = {}
+    for index in range(sizes.diagrams):
+        kind = DIAGRAM_KINDS[index % len(DIAGRAM_KINDS)]
+        size = max(2, round(sizes.diagram_size * rng.uniform(0.5, 1.5)))
+        name = f"{kind.capitalize()}Diagram{index}.puml"
+        files[os.path.join(root, UML_DIR, name)] = DIAGRAMS[kind](rng, size)
+    return files
+
+def history_stream(rng, root, files, sizes):
+    """git fast-import stream: one commit adding `files`, then edits to the sources
+    
+    Edits append a line to a source file, so `files` ends up holding what the
+    last commit contains.
+    """
+    authors = [f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}" for _ in range(sizes.authors)]
+    sources = sorted(path for path in files if path.endswith(".cs"))
+    stream = io.BytesIO()
+    timestamp = HISTORY_START
+
+    def commit(author, message, changes):
+        name = author.encode('utf-8')
+        email = author.split()[0].lower().encode('ascii', errors='ignore')
+        message = message.encode('utf-8')
+        stream.write(b"commit refs/heads/main\ncommitter %s <%s@example.com> %d +0000\ndata %d\n%s\n"
+                     % (name, email, timestamp, len(message), message))
+        for path in changes:
+            data = files[path].encode('utf-8')
+            relative = os.path.relpath(path, root).replace(os.sep, "/").encode('utf-8')
+            stream.write(b"M 644 inline %s\ndata %d\n%s\n" % (relative, len(data), data))
+    
+    commit(authors[0], "Initial import", sorted(files))
+    for index in range(1, sizes.commits):
+        timestamp += rng.randint(600, 2 * 86400)
+        if not sources:
+            continue
+        path = rng.choice(sources)
+        verb = rng.choice(_VERBS)
+        subject = f"{verb} {os.path.splitext(os.path.basename(path))[0]}"
+        files[path] += f"// {verb.lower()} #{index}\n"
+        commit(rng.choice(authors), subject, [path])
+    return stream.getvalue()
+
+def write_files(files):
+    """Write {path: text}, creating directories as needed"""
+    for path, text in files.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+
+def generate_fixture(root, seed=0, sizes=DEFAULT_SIZES, results=True, history=True):
+    """Write a synthetic solution under root, return the number of files written
+    
+    The same seed and sizes always give the same tree and the same commit hashes.
+    """
+    rng = random.Random(seed)
+    files = source_files(root, rng, sizes)
+    tests_by_path, tests = test_files(root, rng, sizes)
+    files.update(tests_by_path)
+    files.update(diagram_files(root, rng, sizes))
+    if results:
+        files[os.path.join(root, RESULTS_PATH)] = junit_results(rng, tests)
+    
+    if history and sizes.commits:
+        stream = history_stream(rng, root, files, sizes)
+        subprocess.run(["git", "init", "-q", root], check=True)
+        subprocess.run(["git", "-C", root, "fast-import", "--quiet"], input=stream, check=True)
+        subprocess.run(["git", "-C", root, "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+    # Written after the history, so the work tree matches the last commit
+    write_files(files)
+    if history and sizes.commits:
+        # fast-import leaves the index empty; without this git status shows every file as deleted
+        subprocess.run(["git", "-C", root, "reset", "-q"], check=True)
+    return len(files)
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate a large synthetic solution for scale tests")
+    parser.add_argument("root", help="directory to create, must not exist or be empty")
+    parser.add_argument("--seed", type=int, default=0, help="same seed, same fixture (default: 0)")
+    for field in FixtureSizes._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=getattr(DEFAULT_SIZES, field),
+                            metavar="N", help=f"(default: {getattr(DEFAULT_SIZES, field)})")
+    parser.add_argument("--no-results", dest="results", action="store_false",
+                        help=f"do not write JUnit results to {RESULTS_PATH}")
+    args = parser.parse_args(argv)
+    if os.path.exists(args.root) and os.listdir(args.root):
+        parser.error(f"{args.root} is not empty")
+    if any(getattr(args, field) < 0 for field in FixtureSizes._fields) or args.authors < 1:
+        parser.error("sizes must not be negative and there must be at least one author")
+    args.sizes = FixtureSizes(*(getattr(args, field) for field in FixtureSizes._fields))
+    return args
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    count = generate_fixture(args.root, args.seed, args.sizes, args.results)
+    sizes = args.sizes
+    print(f"Wrote {count} files to {args.root}: {sizes.models} models, "
+          f"{sizes.test_classes * sizes.tests_per_class} tests, {sizes.diagrams} diagrams, "
+          f"{sizes.commits} commits (seed {args.seed})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Streaming access to a repository's commit history, for the documentation's
+Git section
+"""
+
+import subprocess
+from collections import namedtuple
+
+Commit = namedtuple("Commit", "hash date author subject")
+
+# Fields are separated by the ASCII unit separator, records by NUL (git log -z)
+LOG_FORMAT = "--format=%h%x1f%ad%x1f%an%x1f%s"
+READ_SIZE = 64 * 1024
+
+class GitError(Exception):
+    """git is not installed, the path is not a repository or a filter is invalid"""
+
+def _revision_args(since=None, until=None, branch=None):
+    args = []
+    if since:
+        args.append(f"--since={since}")
+    if until:
+        args.append(f"--until={until}")
+    # The revision goes before "--" so a branch name is never taken for a path
+    args += [branch or "HEAD", "--"]
+    return args
+
+def count_commits(repo, since=None, until=None, branch=None):
+    """Number of commits matching the filters, without listing them"""
+    try:
+        result = subprocess.run(["git", "-C", str(repo), "rev-list", "--count",
+                                 *_revision_args(since, until, branch)],
+                                capture_output=True, text=True)
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}")
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip())
+    return int(result.stdout)
+
+def iter_commits(repo, since=None, until=None, branch=None, max_count=None, reverse=False):
+    """Yield Commits as git log produces them
+    
+    Output is read in blocks, so memory use does not grow with the history.
+    Closing the generator early stops git.
+    """
+    command = ["git", "-C", str(repo), "log", "-z", LOG_FORMAT, "--date=short"]
+    if max_count:
+        command.append(f"--max-count={max_count}")
+    if reverse:
+        # git applies --max-count first, so this is the newest commits, oldest first
+        command.append("--reverse")
+    command += _revision_args(since, until, branch)
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}")
+    
+    try:
+        pending = b""
+        while True:
+            block = process.stdout.read1(READ_SIZE)
+            if not block:
+                break
+            *records, pending = (pending + block).split(b"\0")
+            for record in records:
+                yield Commit(*record.decode('utf-8', errors='replace').split("\x1f", 3))
+        if pending:
+            yield Commit(*pending.decode('utf-8', errors='replace').split("\x1f", 3))
+        if process.wait() != 0:
+            raise GitError(process.stderr.read().decode('utf-8', errors='replace').strip())
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+PlantUML text encoding used in server URLs, with a micro-benchmark of the
+compression levels
+"""
+
+import argparse
+import base64
+import sys
+import time
+import zlib
+from pathlib import Path
+
+# PlantUML's own base64 variant: same bit layout, different alphabet, no padding
+PLANTUML_ALPHABET = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_"
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_TO_PLANTUML = bytes.maketrans(_BASE64_ALPHABET, PLANTUML_ALPHABET)
+_FROM_PLANTUML = bytes.maketrans(PLANTUML_ALPHABET, _BASE64_ALPHABET)
+
+HEX_PREFIX = "~h"
+DEFLATE = "deflate"
+HEX = "hex"
+METHODS = (DEFLATE, HEX)
+DEFAULT_LEVEL = 9
+DEFAULT_MAX_URL_LENGTH = 4096
+
+def encode64(data):
+    """Encode bytes with PlantUML's alphabet"""
+    # PlantUML always emits whole 4 character groups, zero filling the last one
+    remainder = len(data) % 3
+    if remainder:
+        data += b"\0" * (3 - remainder)
+    return base64.b64encode(data).translate(_TO_PLANTUML).decode('ascii')
+
+def decode64(text):
+    """Inverse of encode64, trailing fill bytes included"""
+    return base64.b64decode(text.encode('ascii').translate(_FROM_PLANTUML))
+
+def deflate(data, level=DEFAULT_LEVEL):
+    """Raw deflate stream without zlib header or checksum"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+def encode(plantuml_text, level=DEFAULT_LEVEL, method=DEFLATE):
+    """Encode PlantUML text for a server URL"""
+    data = plantuml_text.encode('utf-8')
+    if method == HEX:
+        return HEX_PREFIX + data.hex()
+    if method != DEFLATE:
+        raise ValueError(f"Unknown encoding method {method!r}")
+    return encode64(deflate(data, level))
+
+def decode(encoded):
+    """Recover PlantUML text from either encoding"""
+    if encoded.startswith(HEX_PREFIX):
+        return bytes.fromhex(encoded[len(HEX_PREFIX):]).decode('utf-8')
+    # Zero fill after the end of the deflate stream is ignored by the decompressor
+    decompressor = zlib.decompressobj(-15)
+    return decompressor.decompress(decode64(encoded)).decode('utf-8')
+
+def benchmark(plantuml_text, levels=range(1, 10), repeat=20):
+    """Time encode() per compression level, return (level, seconds, length) rows"""
+    rows = []
+    for level in levels:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encoded = encode(plantuml_text, level)
+        rows.append((level, (time.perf_counter() - start) / repeat, len(encoded)))
+    hex_start = time.perf_counter()
+    for _ in range(repeat):
+        encoded = encode(plantuml_text, method=HEX)
+    rows.append((HEX, (time.perf_counter() - hex_start) / repeat, len(encoded)))
+    return rows
+
+def parse_levels(value):
+    """argparse type for '9', '1,6,9' or '1-9'"""
+    levels = set()
+    for part in value.split(","):
+        low, _, high = part.partition("-")
+        levels.update(range(int(low), int(high or low) + 1))
+    if not levels or min(levels) < 0 or max(levels) > 9:
+        raise argparse.ArgumentTypeError("compression levels must be between 0 and 9")
+    return sorted(levels)
+
+def main(argv=None):
+    """Benchmark encoding of the given .puml files"""
+    parser = argparse.ArgumentParser(description="Compare PlantUML encode time and URL length "
+                                                 "across compression levels")
+    parser.add_argument("files", nargs="+", type=Path, help=".puml files to encode")
+    parser.add_argument("--levels", type=parse_levels, default=list(range(1, 10)),
+                        help="compression levels to compare, e.g. 1-9 or 1,6,9 (default: 1-9)")
+    parser.add_argument("--repeat", type=int, default=20, help="encodes timed per level")
+    parser.add_argument("--max-url-length", type=int, default=DEFAULT_MAX_URL_LENGTH,
+                        help="flag payloads longer than this as needing POST "
+                             f"(default: {DEFAULT_MAX_URL_LENGTH})")
+    args = parser.parse_args(argv)
+    
+    for path in args.files:
+        plantuml_text = path.read_text(encoding='utf-8')
+        print(f"{path.name} ({len(plantuml_text.encode('utf-8'))} bytes)")
+        print(f"  {'level':>5}  {'encode':>10}  {'length':>7}")
+        rows = benchmark(plantuml_text, args.levels, args.repeat)
+        shortest = min(length for _, _, length in rows)
+        for level, seconds, length in rows:
+            notes = []
+            if length == shortest:
+                notes.append("shortest")
+            if length > args.max_url_length:
+                notes.append("needs POST")
+            print(f"  {level:>5}  {seconds * 1e6:>8.1f}us  {length:>7}  {', '.join(notes)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of separately laid out documentation sections, keyed by a
+fingerprint of the flowables each section produces
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+from reportlab import Version as REPORTLAB_VERSION
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.styles import PropertySet
+from reportlab.platypus import Flowable, Image, KeepTogether, Paragraph, Table
+
+from cache_dirs import cache_location
+from documentation_images import content_digest
+from documentation_tables import StreamingTable
+
+# Bump when the layout code changes in a way the flowables do not show
+CACHE_VERSION = 1
+# Entries not reused for this long are removed by prune()
+MAX_AGE_DAYS = 30
+
+_LEAF_TYPES = (str, bytes, int, float, bool, type(None))
+
+class _Fingerprint:
+    """Feeds flowables into a digest by what they print, not by identity"""
+    
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self._styles = set()
+    
+    def feed(self, value):
+        update = self.digest.update
+        if isinstance(value, _LEAF_TYPES):
+            update(repr(value).encode('utf-8'))
+        elif isinstance(value, (list, tuple)):
+            update(b"[")
+            for item in value:
+                self.feed(item)
+                update(b",")
+            update(b"]")
+        elif isinstance(value, dict):
+            self.feed(sorted(value.items(), key=lambda item: str(item[0])))
+        elif isinstance(value, Paragraph):
+            self.feed(("Paragraph", value.text, value.bulletText, value.style))
+        elif isinstance(value, PropertySet):
+            # Paragraph and cell styles: the full set of values once, then only the name
+            self.feed((type(value).__name__, value.name))
+            if value.name not in self._styles:
+                self._styles.add(value.name)
+                self.feed({key: item for key, item in vars(value).items() if key != 'parent'})
+        elif isinstance(value, Table):
+            self.feed(("Table", value._cellvalues, value._argW, value._argH, value.repeatRows,
+                       value.hAlign, value._linecmds, value._bkgrndcmds, value._spanCmds,
+                       [[vars(style) for style in row] for row in value._cellStyles]))
+        elif isinstance(value, StreamingTable):
+            # Rows are read here once more; they are not kept by the table
+            self.feed(("StreamingTable", value.header, value.col_widths, value.hAlign,
+                       value.style.getCommands()))
+            for row in value.iter_rows():
+                self.feed(row)
+        elif isinstance(value, Image):
+            self.feed(("Image", content_digest(value.filename), value.drawWidth, value.drawHeight,
+                       value.hAlign))
+        elif isinstance(value, Drawing):
+            # DrawingCache marks the drawings it builds with the digest of their SVG
+            source = getattr(value, 'source_digest', None)
+            if source is None:
+                source = hashlib.sha256(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)).hexdigest()
+            self.feed(("Drawing", source, value.width, value.height, value.hAlign))
+        elif isinstance(value, KeepTogether):
+            self.feed(("KeepTogether", value._content))
+        elif isinstance(value, Flowable):
+            # Spacer, PageBreak and the like are described by their plain attributes
+            self.feed((type(value).__name__, {key: item for key, item in vars(value).items()
+                                              if isinstance(item, _LEAF_TYPES)}))
+        else:
+            # Colors and other small values have a repr that shows their content
+            update(f"{type(value).__name__}:{value!r}".encode('utf-8'))
+
+def fingerprint(flowables, *context):
+    """Hex digest of a section's flowables and anything else its layout depends on
+    
+    Text, styles, table commands and the content of embedded images all take
+    part, so two sections with the same fingerprint lay out the same pages.
+    """
+    state = _Fingerprint()
+    state.feed((CACHE_VERSION, REPORTLAB_VERSION, context))
+    state.feed(list(flowables))
+    return state.digest.hexdigest()
+
+class SectionCache:
+    """Laid out section PDFs with their page counts and headings
+    
+    Each entry is a <section>-<fingerprint>.pdf file next to a .json file with
+    the layout facts the merge needs; the JSON is written last, so an entry
+    without it is incomplete and ignored.
+    """
+    
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or cache_location("sections")
+    
+    def _paths(self, name, key):
+        stem = os.path.join(self.cache_dir, f"{name}-{key}")
+        return f"{stem}.pdf", f"{stem}.json"
+    
+    def get(self, name, key):
+        """(pages, headings, PDF path) of a cached layout, or None"""
+        pdf_path, meta_path = self._paths(name, key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            # Touch the entry so prune() keeps what is still in use
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(pdf_path):
+            return None
+        return meta["pages"], [tuple(heading) for heading in meta["headings"]], pdf_path
+    
+    def put(self, name, key, source_path, pages, headings):
+        """Copy a freshly laid out section into the cache, return it as get() would"""
+        pdf_path, meta_path = self._paths(name, key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{pdf_path}.{os.getpid()}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, pdf_path)
+        temp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"pages": pages, "headings": [list(heading) for heading in headings]},
+                      f, ensure_ascii=False)
+        os.replace(temp_path, meta_path)
+        return pages, [tuple(heading) for heading in headings], pdf_path
+    
+    def prune(self, max_age_days=MAX_AGE_DAYS):
+        """Remove entries that have not been reused for max_age_days, return how many"""
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        try:
+            filenames = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        for filename in filenames:
+            if not filename.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.cache_dir, filename)
+            try:
+                if os.path.getmtime(meta_path) >= cutoff:
+                    continue
+                os.remove(meta_path)
+                os.remove(f"{meta_path[:-len('.json')]}.pdf")
+            except OSError:
+                continue
+            removed += 1
+        return removed
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Inventory of the MSTest classes in the test project, optionally joined with
+a TRX or JUnit results file
+"""
+
+import argparse
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from csharp_scanner import body_end, doc_summary, strip_comments
+
+TestClass = namedtuple("TestClass", "name summary methods path")
+TestMethod = namedtuple("TestMethod", "name cases")
+# rows and passed count the per-row results of a data driven test, both 0 when
+# the results file only has one result for the whole test
+TestResult = namedtuple("TestResult", "outcome duration rows passed", defaults=(0, 0))
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+# Outcome of a test made of several results, most significant first
+_OUTCOME_ORDER = (FAILED, PASSED, SKIPPED)
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+_TEST_CLASS = re.compile(
+    r"\[\s*TestClass\b[^\]]*\]\s*(?:\[[^\]]*\]\s*)*"
+    r"(?:(?:public|internal|sealed|static|partial|abstract)\s+)*class\s+(?P<name>\w+)[^{]*\{")
+_METHOD = re.compile(
+    r"(?P<attributes>(?:\[[^\]]*\]\s*)+)public\s+(?:(?:async|static|virtual|override)\s+)*"
+    r"[\w.]+(?:<[^(]*?>)?[?\[\]]*\s+(?P<name>\w+)\s*\(")
+_TEST_ATTRIBUTE = re.compile(r"\b(?:Data)?TestMethod\b")
+_CASE_ATTRIBUTE = re.compile(r"\bDataRow\s*\(")
+
+def parse_test_source(source, path=None):
+    """[TestClass] classes declared in C# source text"""
+    code = strip_comments(source)
+    classes = []
+    for match in _TEST_CLASS.finditer(code):
+        body = code[match.end() - 1:body_end(code, match.end() - 1)]
+        methods = []
+        for method in _METHOD.finditer(body):
+            attributes = method.group("attributes")
+            if _TEST_ATTRIBUTE.search(attributes):
+                cases = len(_CASE_ATTRIBUTE.findall(attributes)) or 1
+                methods.append(TestMethod(method.group("name"), cases))
+        classes.append(TestClass(match.group("name"), doc_summary(source, match.start()),
+                                 methods, path))
+    return classes
+
+def scan_test_file(path):
+    """Test classes of one .cs file"""
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        return parse_test_source(f.read(), path)
+
+def find_test_files(test_dir):
+    """.cs files of the test project, in path order, build output excluded"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(test_dir):
+        dirnames[:] = sorted(name for name in dirnames if name not in ("bin", "obj"))
+        files.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".cs"))
+    return files
+
+def scan_tests(test_dir, jobs=None):
+    """Test classes of a test project, files parsed in parallel when there are many"""
+    files = find_test_files(test_dir)
+    if len(files) < PARALLEL_THRESHOLD or jobs == 1:
+        results = map(scan_test_file, files)
+        return [test_class for classes in results for test_class in classes]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(scan_test_file, files, chunksize=16)
+        return [test_class for classes in results for test_class in classes]
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+def _trx_duration(value):
+    """Seconds in a TRX 'hh:mm:ss.fffffff' duration"""
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def load_trx(path):
+    """Results of an MSTest .trx file keyed by (class name, test name)"""
+    names = {}
+    results = {}
+    rows = {}
+    # iterparse keeps memory flat for result files of any size
+    for _, element in ET.iterparse(path):
+        tag = _local(element.tag)
+        if tag == "UnitTest":
+            method = next((child for child in element if _local(child.tag) == "TestMethod"), None)
+            if method is not None:
+                class_name = method.get("className", "").split(",")[0].rsplit(".", 1)[-1]
+                names[element.get("id")] = (class_name, method.get("name"))
+            element.clear()
+        elif tag == "UnitTestResult":
+            outcome = element.get("outcome", "").lower()
+            outcome = {"passed": PASSED, "failed": FAILED, "error": FAILED,
+                       "timeout": FAILED}.get(outcome, SKIPPED)
+            duration = _trx_duration(element.get("duration", "0:0:0"))
+            test_id = element.get("testId")
+            if test_id in results:
+                # The previous result with this testId was a data row, see below
+                rows.setdefault(test_id, []).append(results[test_id][1])
+            results[test_id] = (element.get("testName"), outcome, duration)
+            element.clear()
+    # Results come before the test definitions in the file, so join at the end.
+    # Data driven tests nest one result per row inside an aggregate result with
+    # the same testId, which is seen last and wins.
+    return {names.get(test_id, ("", test_name)):
+            TestResult(outcome, duration, len(rows.get(test_id, ())),
+                       rows.get(test_id, []).count(PASSED))
+            for test_id, (test_name, outcome, duration) in results.items()}
+
+def load_junit(path):
+    """Results of a JUnit XML file keyed by (class name, test name)"""
+    results = {}
+    for _, element in ET.iterparse(path):
+        if _local(element.tag) != "testcase":
+            continue
+        children = {_local(child.tag) for child in element}
+        if children & {"failure", "error"}:
+            outcome = FAILED
+        elif "skipped" in children:
+            outcome = SKIPPED
+        else:
+            outcome = PASSED
+        class_name = element.get("classname", "").rsplit(".", 1)[-1]
+        name = element.get("name", "")
+        duration = float(element.get("time") or 0)
+        if "(" not in name:
+            results[(class_name, name)] = TestResult(outcome, duration)
+        else:
+            # A data row, "Test (1, 2)": add it to the results of its test
+            key = (class_name, name.split("(", 1)[0].strip())
+            previous = results.get(key, TestResult(SKIPPED, 0.0))
+            # The test failed if any row failed, and passed if the rest were not all skipped
+            merged = min(previous.outcome, outcome, key=_OUTCOME_ORDER.index)
+            results[key] = TestResult(merged, previous.duration + duration, previous.rows + 1,
+                                      previous.passed + (outcome == PASSED))
+        element.clear()
+    return results
+
+def passed_cases(method, result):
+    """How many data rows of a test passed: counted per row when the results have
+    rows, otherwise all or none of them by the test's overall outcome"""
+    if result is None:
+        return 0
+    if result.rows:
+        return result.passed
+    return method.cases if result.outcome == PASSED else 0
+
+def load_results(path):
+    """Test results from a .trx or JUnit .xml file"""
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+    if path.lower().endswith(".trx") or b"TeamTest" in head:
+        return load_trx(path)
+    return load_junit(path)
+
+def main(argv=None):
+    """Print the inventory, mainly to check it against the test project"""
+    parser = argparse.ArgumentParser(description="List MSTest classes and their test methods")
+    parser.add_argument("test_dir", help="test project directory, e.g. BudgetPlanner.Tests")
+    parser.add_argument("--results", help="TRX or JUnit XML results to join")
+    parser.add_argument("-j", "--jobs", type=int, help="processes used to parse large projects")
+    args = parser.parse_args(argv)
+    
+    results = load_results(args.results) if args.results else {}
+    for test_class in scan_tests(args.test_dir, args.jobs):
+        cases = sum(method.cases for method in test_class.methods)
+        print(f"{test_class.name}: {cases} test(s)")
+        for method in test_class.methods:
+            result = results.get((test_class.name, method.name))
+            status = f"  {result.outcome} {result.duration * 1000:.0f} ms" if result else ""
+            print(f"  {method.name}{status}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())